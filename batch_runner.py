@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+''' Runs the climate scripts for many stations in parallel.
+
+Takes either a directory of station CSV files (the station ID is the file name without .csv) or a manifest CSV
+file with the columns id,name,file (relative file paths are taken relative to the manifest), and runs the
+daily stats (daily_climate_stats_1_0.py: stats, histograms and annual plots) and monthly (monthly.py) stages for
+every station on a pool of worker processes. Outputs are written to OUTPUT_DIR/<station id>/ so that stations do not
+overwrite each other:
+    <id>_stats.csv, <id>_stats.npz, <id>_stats_events*.csv, <id>_stats_records.csv, images/*.png, temperatures.png,
+        stdevs.png, polyfit.png                                              (daily stage)
+    <id>_monthly.csv, monthly.png                                            (monthly stage)
+
+A summary of the time taken by every station and stage and of any failures is printed at the end. With
+CLIMATE_PROFILE set (see profiling.py), every worker writes its stage timings to <file>.<pid>.json.
+
+Usage:
+    python batch_runner.py stations/ -o output --workers 8
+    python batch_runner.py manifest.csv -o output --stages daily
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): Workers write their profiling records after every task.
+'''
+
+# import modules
+import argparse
+import concurrent.futures
+import csv
+import os
+import profiling
+import sys
+import time
+import traceback
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.1"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+STAGES = ("daily","monthly")
+
+# read the list of stations as (id,name,file) tuples from a directory or manifest file
+def readStations(path):
+    if os.path.isdir(path):
+        files = sorted(f for f in os.listdir(path) if f.lower().endswith(".csv"))
+        return [(os.path.splitext(f)[0],os.path.splitext(f)[0],os.path.join(path,f)) for f in files]
+
+    stations = []
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path,"r") as f:
+        for row in csv.DictReader(f):
+            climo_file = row['file'] if os.path.isabs(row['file']) else os.path.join(base,row['file'])
+            stations.append((row['id'],row.get('name') or row['id'],climo_file))
+    return stations
+
+# run one stage for one station (executed in a worker process, so the histograms are drawn without a nested pool);
+# returns (station id,stage,seconds,error)
+def runStage(stage,station_id,name,climo_file,output_dir):
+    start = time.time()
+    try:
+        station_dir = os.path.join(output_dir,station_id)
+        if not os.path.isdir(station_dir):
+            os.makedirs(station_dir)
+        if stage == "daily":
+            import daily_climate_stats_1_0
+            daily_climate_stats_1_0.run(climo_file,os.path.join(station_dir,station_id + "_stats.csv"),name,\
+                os.path.join(station_dir,"images"),station_dir,verbose=False,render_workers=1)
+        elif stage == "monthly":
+            import monthly
+            monthly.run(climo_file,os.path.join(station_dir,station_id + "_monthly.csv"),\
+                os.path.join(station_dir,"monthly.png"))
+        else:
+            raise ValueError("unknown stage: %s" % stage)
+        error = None
+    except Exception:
+        error = traceback.format_exc().strip().split("\n")[-1]
+    # workers exit without running atexit handlers, so their stage timings are written after every task
+    profiling.flush()
+    return station_id,stage,time.time() - start,error
+
+# run the stages for every station on a process pool; returns the list of runStage results
+def runAll(stations,output_dir,stages=STAGES,workers=None):
+    # worker processes only write image files, so they never need an interactive matplotlib backend
+    os.environ.setdefault("MPLBACKEND","Agg")
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        # the daily stage is submitted first for every station since it takes the longest
+        futures = [pool.submit(runStage,stage,station_id,name,climo_file,output_dir)
+            for stage in stages for station_id,name,climo_file in stations]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print("%-20s %-8s %8.2f s %s" % (result[0],result[1],result[2],"FAILED" if result[3] else "ok"))
+    return results
+
+# print the per station timings and failures
+def printSummary(results,elapsed):
+    stations = sorted(set(result[0] for result in results))
+    stages = [stage for stage in STAGES if any(result[1] == stage for result in results)]
+    timings = dict(((result[0],result[1]),result[2]) for result in results)
+    failures = [result for result in results if result[3]]
+
+    print("\n%-20s " % "Station" + " ".join("%10s" % stage for stage in stages) + " %10s" % "total")
+    for station_id in stations:
+        times = [timings.get((station_id,stage),0.0) for stage in stages]
+        print("%-20s " % station_id + " ".join("%10.2f" % t for t in times) + " %10.2f" % sum(times))
+
+    busy = sum(result[2] for result in results)
+    print("\n%i stations, %i tasks, %i failed" % (len(stations),len(results),len(failures)))
+    print("Wall time %.2f s, task time %.2f s (average concurrency %.1fx)" % (elapsed,busy,busy / elapsed if elapsed else 0.0))
+    for station_id,stage,seconds,error in sorted(failures):
+        print("FAILED %s %s: %s" % (station_id,stage,error))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the daily and monthly climate stats for many stations.")
+    parser.add_argument("stations",help="directory of station CSV files or manifest CSV file (id,name,file)")
+    parser.add_argument("-o","--output-dir",default="output",help="directory for the per station outputs")
+    parser.add_argument("-w","--workers",type=int,default=None,help="number of worker processes (default: CPUs)")
+    parser.add_argument("--stages",default=",".join(STAGES),help="comma separated stages to run (%s)" % ",".join(STAGES))
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    for stage in stages:
+        if stage not in STAGES:
+            parser.error("unknown stage: %s" % stage)
+
+    start = time.time()
+    results = runAll(readStations(args.stations),args.output_dir,stages,args.workers)
+    printSummary(results,time.time() - start)
+    sys.exit(1 if any(result[3] for result in results) else 0)
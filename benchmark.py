@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+''' Benchmarks of the climate scripts on synthetic station records.
+
+Generates synthetic stations (a seasonal cycle of highs and lows with day to day persistence, dry and wet days and
+trace amounts) of any length and number, writes them in the raw MMDDYYYY layout read by date_converter.py and times
+each stage of the pipeline separately:
+    convert      date_converter.convert (raw file to the dfw.csv and dfw_final.csv layouts)
+    load         parsing the station CSV file (climate_tools_v2.parseStation, no cache)
+    daily        per date stats through climate_tools_v2.climateStats
+    monthly      monthly average temperature stats (climate_tools_v2.periodStats)
+    probability  probability tables and queries_per_station probability queries (batchProbabilities)
+    render       summary plots and render_dates days of histograms (daily_climate_stats_1_0.py)
+    startup      a single command line lookup (temperature_probability_1_1.py --date --high --low) in a new Python
+                 process, from the cached probability tables (the cold start of the interpreter and the imports)
+
+Every stage is run repeat times and the fastest time is kept. Results are written as JSON, and if a baseline
+results file is given, stages that are slower than the baseline by more than the threshold are reported as
+regressions. A startup time over startup_budget seconds is reported as well (the exit status is 1 in both cases).
+Everything runs offline in a temporary directory.
+
+Usage:
+    python benchmark.py --years 100 --stations 2 -o bench.json
+    python benchmark.py --years 100 --stations 2 -o new.json --baseline bench.json --threshold 0.25
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): Added the startup stage and its budget.
+'''
+
+# import modules
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# the render stage only writes image files
+os.environ.setdefault("MPLBACKEND","Agg")
+
+import climate_tools_v2
+import daily_climate_stats_1_0
+import date_converter
+import numpy as np
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.1"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+### USER SETTINGS SECTION BEGIN ###
+years = 100                     # length of each synthetic station record in years
+stations = 1                    # number of synthetic stations
+repeat = 3                      # runs of every stage (the fastest is kept)
+queries_per_station = 100000    # probability queries per station
+render_dates = 7                # calendar dates of histograms drawn by the render stage
+threshold = 0.2                 # relative slowdown against the baseline reported as a regression
+seed = 0                        # random seed of the synthetic stations
+startup_budget = 0.75           # seconds allowed for the startup stage (one lookup in a new process)
+### USER SETTINGS SECTION END (DO NOT EDIT BELOW THIS LINE UNLESS YOU REALLY KNOW WHAT YOU ARE DOING!) ###
+
+STAGES = ("convert","load","daily","monthly","probability","render","startup")
+PROBABILITY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),"temperature_probability_1_1.py")
+
+# write a synthetic station in the raw layout (MMDDYYYY,high,low,precip; no header line); returns the row count
+def syntheticStation(raw_file,years=years,first_year=1900,seed=seed):
+    rng = np.random.default_rng(seed)
+    ordinals = np.arange(climate_tools_v2.dateOrdinals(first_year,1,1),climate_tools_v2.dateOrdinals(first_year + years,1,1))
+    station_years,months,days = climate_tools_v2.civilDates(ordinals)
+    n = len(ordinals)
+
+    # seasonal cycle (warmest in late July) plus AR(1) anomalies, so warm and cold spells persist for days
+    phase = 2.0 * np.pi * (climate_tools_v2.calendarRows(months,days) - 207) / 366.0
+    anomalies = rng.normal(0.0,1.0,n)
+    for lag in range(1,4):
+        anomalies[lag:] += 0.5 ** lag * anomalies[:-lag]
+    highs = np.rint(76.0 + 20.0 * np.cos(phase) + (9.0 - 4.0 * np.cos(phase)) * anomalies / 1.3)
+    lows = np.rint(highs - 20.0 + 2.0 * np.cos(phase) + rng.normal(0.0,4.0,n))
+
+    # about one day in four is wet, with occasional trace amounts
+    wet = rng.random(n)
+    amounts = np.round(rng.exponential(0.4,n),2)
+    precip = np.where(wet < 0.72,"0.00",np.where(wet < 0.76,"T",np.char.mod("%.2f",np.maximum(amounts,0.01))))
+
+    stamps = months * 1000000 + days * 10000 + station_years
+    with open(raw_file,"w") as f:
+        for row in zip(stamps.tolist(),highs.tolist(),lows.tolist(),precip.tolist()):
+            f.write("%i,%.1f,%.1f,%s\n" % row)
+    return n
+
+# time fn() repeat times (setup() runs before each call, untimed); returns (fastest seconds,last result)
+def timeStage(fn,repeat=repeat,setup=None):
+    best,result = None,None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best,elapsed)
+    return best,result
+
+# run every stage for every synthetic station; returns the results as a dict (see writeResults)
+def runBenchmarks(years=years,stations=stations,repeat=repeat,queries_per_station=queries_per_station,\
+    render_dates=render_dates,seed=seed,work_dir=None):
+    # only a temporary directory created here is removed afterwards
+    created = not work_dir
+    work_dir = work_dir or tempfile.mkdtemp(prefix="climate_bench_")
+    timings = dict((stage,0.0) for stage in STAGES)
+    total_rows = 0
+    rng = np.random.default_rng(seed)
+    try:
+        for s in range(stations):
+            raw_file = os.path.join(work_dir,"station%i_raw.csv" % s)
+            final_file = os.path.join(work_dir,"station%i_final.csv" % s)
+            climo_file = os.path.join(work_dir,"station%i.csv" % s)
+            rows = syntheticStation(raw_file,years,seed=seed + s)
+            total_rows += rows
+
+            seconds,_ = timeStage(lambda: date_converter.convert(raw_file,final_file,climo_file),repeat)
+            timings['convert'] += seconds
+            seconds,data = timeStage(lambda: climate_tools_v2.parseStation(climo_file),repeat)
+            timings['load'] += seconds
+
+            # the binary cache is removed before every run so the CSV file is parsed each time
+            cache_dir = os.path.join(work_dir,climate_tools_v2.CACHE_DIR)
+            clear_cache = lambda: shutil.rmtree(cache_dir,ignore_errors=True)
+            seconds,_ = timeStage(lambda: climate_tools_v2.climateStats(climo_file),repeat,clear_cache)
+            timings['daily'] += seconds
+
+            daily_avg = (data['high'] + data['low']) / 2.0
+            seconds,_ = timeStage(lambda: climate_tools_v2.periodStats(data['ordinal'],daily_avg,["month"]),repeat)
+            timings['monthly'] += seconds
+
+            query_rows = rng.integers(0,len(climate_tools_v2.CALENDAR_DATES),queries_per_station)
+            query_highs = rng.integers(30,110,queries_per_station).astype(float)
+            query_lows = query_highs - rng.integers(5,30,queries_per_station)
+            def probability():
+                stats = climate_tools_v2.CalendarStats(data['doy'],data['high'],data['low'])
+                high_hist,low_hist = stats.histograms()
+                return climate_tools_v2.batchProbabilities(stats.probabilityTable(),query_rows,query_highs,\
+                    query_lows,high_hist,low_hist)
+            seconds,_ = timeStage(probability,repeat)
+            timings['probability'] += seconds
+
+            # a fresh image directory each run so that no histogram is skipped
+            result = daily_climate_stats_1_0.dailyStats(climo_file)
+            plot_dir = os.path.join(work_dir,"plots%i" % s)
+            def render():
+                shutil.rmtree(plot_dir,ignore_errors=True)
+                daily_climate_stats_1_0.plotSummary(result,result['first_year'],result['last_year'],\
+                    "Synthetic %i" % s,plot_dir)
+                daily_climate_stats_1_0.plotHistograms(result,os.path.join(plot_dir,"images"),verbose=False,\
+                    rows=np.arange(render_dates),workers=1)
+            seconds,_ = timeStage(render,repeat)
+            timings['render'] += seconds
+
+            # the first lookup builds the cached tables; the timed runs read them
+            command = [sys.executable,PROBABILITY_SCRIPT,climo_file,"--date","07/15","--high","100","--low","75"]
+            startup = lambda: subprocess.run(command,check=True,stdout=subprocess.DEVNULL)
+            startup()
+            seconds,_ = timeStage(startup,repeat)
+            timings['startup'] = max(timings['startup'],seconds)
+    finally:
+        if created:
+            shutil.rmtree(work_dir,ignore_errors=True)
+
+    return {
+        'version': __version__,
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'environment': {'python':platform.python_version(),'numpy':np.__version__,'platform':platform.platform(),\
+            'cpus':os.cpu_count()},
+        'config': {'years':years,'stations':stations,'repeat':repeat,'queries_per_station':queries_per_station,\
+            'render_dates':render_dates,'seed':seed},
+        'rows': total_rows,
+        'stages': dict((stage,{'seconds':timings[stage],'rows_per_s':total_rows / timings[stage] \
+            if timings[stage] and stage != "startup" else None}) for stage in STAGES),
+    }
+
+# stages slower than in the baseline by more than threshold (relative); returns a list of (stage,baseline,current)
+def findRegressions(results,baseline,threshold=threshold):
+    regressions = []
+    for stage in STAGES:
+        if stage in baseline.get('stages',{}) and stage in results['stages']:
+            before = baseline['stages'][stage]['seconds']
+            after = results['stages'][stage]['seconds']
+            if before and after > before * (1.0 + threshold):
+                regressions.append((stage,before,after))
+    return regressions
+
+def writeResults(results,output_file):
+    with open(output_file,"w") as f:
+        json.dump(results,f,indent=2,sort_keys=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the climate scripts on synthetic stations.")
+    parser.add_argument("--years",type=int,default=years,help="years of record of each station")
+    parser.add_argument("--stations",type=int,default=stations,help="number of stations")
+    parser.add_argument("--repeat",type=int,default=repeat,help="runs of each stage (the fastest is kept)")
+    parser.add_argument("--queries",type=int,default=queries_per_station,help="probability queries per station")
+    parser.add_argument("--seed",type=int,default=seed,help="random seed of the synthetic stations")
+    parser.add_argument("-o","--output",default="benchmark.json",help="output JSON file")
+    parser.add_argument("--baseline",help="earlier results file to compare against")
+    parser.add_argument("--threshold",type=float,default=threshold,help="relative slowdown reported as a regression")
+    parser.add_argument("--startup-budget",type=float,default=startup_budget,help="seconds allowed for the startup stage")
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.years,args.stations,args.repeat,args.queries,render_dates,args.seed)
+    writeResults(results,args.output)
+    print("%i stations x %i years (%i rows)" % (args.stations,args.years,results['rows']))
+    for stage in STAGES:
+        print("%-12s %10.4f s" % (stage,results['stages'][stage]['seconds']))
+
+    failed = results['stages']['startup']['seconds'] > args.startup_budget
+    if failed:
+        print("OVER BUDGET startup: %.4f s > %.4f s" % (results['stages']['startup']['seconds'],args.startup_budget))
+    if args.baseline:
+        with open(args.baseline,"r") as f:
+            baseline = json.load(f)
+        if baseline.get('config') != results['config']:
+            print("WARNING: the baseline was run with a different configuration: %s" % baseline.get('config'))
+        regressions = findRegressions(results,baseline,args.threshold)
+        for stage,before,after in regressions:
+            print("REGRESSION %s: %.4f s -> %.4f s (%+.0f%%)" % (stage,before,after,100.0 * (after / before - 1.0)))
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
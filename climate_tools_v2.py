@@ -6,61 +6,1394 @@ This file contains various functions for working with climate data. More will be
 Version history:
 1.0 (2017 June 22): Initial build.
 2.0 (2017 June 25): Re-written to use the pandas library. Added computeStats function.
+2.1 (2026 October 17): Added single-pass calendar date grouping and vectorized groupedStats function.
+2.2 (2026 October 17): Added CalendarStats/calendarStats. climateStats is now a wrapper around them.
+2.3 (2026 October 17): Added loadStation, which caches parsed station files as memory-mapped binary columns.
+2.4 (2026 October 17): Added DateHistograms for exact whole-degree percentiles and percentile ranks.
+2.5 (2026 October 17): Added closed-form bivariate normal range probabilities (rangeProbability).
+2.6 (2026 October 17): Added probabilityTable and batchProbabilities for vectorized probability queries.
+2.7 (2026 October 17): Added periodKeys and periodStats for month, season, ISO week, year and water year stats.
+2.8 (2026 October 17): Added ClimatologyAccumulator for updating per date stats with new observations only.
+2.9 (2026 October 17): Added YearlyHistograms for stats over any range of years (i.e. 30-year normals) and
+    statsRows for the daily stats file layout.
+3.0 (2026 October 17): Added StationRecord, a compact int16/int32 representation of a station grouped by date.
+3.1 (2026 October 17): Added StationCube, a memory-mapped station x year x calendar date x variable store.
+3.2 (2026 October 17): Added smoothSeries, batched harmonic (or polynomial) least-squares smoothing.
+3.3 (2026 October 17): Loading, grouping, stats, fits and probabilities are timed as profiling.py stages.
+3.4 (2026 October 17): Added bootstrapIntervals, bootstrap confidence intervals of per date percentiles.
+3.5 (2026 October 17): Added statsTable, saveStats and loadStats for the typed binary (.npz) daily stats file.
+3.6 (2026 October 17): Added findStreaks and EventIndex for heat wave, freeze and dry streaks.
+3.7 (2026 October 17): Added RecordIndex of every record set on each calendar date over the period of record.
+3.8 (2026 October 17): Per date stats, histograms and probability tables can pool a +-window day circular window
+    of calendar dates (circularWindowSums).
+3.9 (2026 October 17): pandas and scipy are imported only by the functions that use them, and probabilityTables
+    caches the probability table and histograms of a station, so a probability lookup starts quickly.
+3.10 (2026 October 17): groupedStats and probabilityTable skip missing values. StationCube puts the calendar date
+    outermost so a one-date query reads only that date's pages. ClimatologyAccumulator keeps the first year of a
+    tied record, as RecordIndex does.
 '''
 
-# import modules
+# import modules (pandas and scipy.special are imported by the functions that need them, since importing them
+# takes longer than a probability lookup from cached tables)
+import concurrent.futures
+import hashlib
+import json
 import numpy as np
-import pandas
+import os
+import profiling
+import struct
+import zipfile
 
 __author__ = "Jason W. Godwin"
 __copyright__ = "Public Domain"
 __credits__ = ""
 
 __license__ = "GPL"
-__version__ = "1.0"
+__version__ = "3.10"
 __maintainer__ = "Jason W. Godwin"
 __email__ = "jasonwgodwin@gmail.com"
 __status__ = "Production"
 
-# function for returning calendar day statistics
+# every valid calendar date (MM/DD), including leap day, in the order used for the daily statistics
+days_in_month = [31,29,31,30,31,30,31,31,30,31,30,31]
+CALENDAR_DATES = ["%02d/%02d" % (month,day) for month in range(1,13) for day in range(1,days_in_month[month-1]+1)]
+DATE_INDEX = dict((date,i) for i,date in enumerate(CALENDAR_DATES))
+MONTH_START = np.concatenate(([0],np.cumsum(days_in_month)[:-1]))
+
+# station data cache settings (columns are stored as one .npy file each so they can be memory-mapped)
+CACHE_DIR = ".climate_cache"
+CACHE_COLUMNS = ("ordinal","month","doy","high","low","precip")
+TABLES_VERSION = 2      # version of the cached probability tables (see probabilityTables); older tables are rebuilt
+TEMP_RANGE = (-20,120)  # default temperature range (degrees F) of DateHistograms; extended as needed
+TRACE = 0.001           # precipitation value used for trace amounts ("T")
+ORDINAL_1970 = 719163   # proleptic Gregorian ordinal of 1970-01-01 (see datetime.date.toordinal)
+
+# encoding of StationRecord arrays (temperatures in whole degrees, precipitation in hundredths of an inch)
+TEMP_MISSING = -32768   # int16 temperature of a missing observation
+PRECIP_TRACE = -1       # int16 precipitation of a trace amount ("T")
+PRECIP_MISSING = -2     # int16 precipitation of a missing observation
+
+# smoothing methods of smoothSeries and the cache of their projection matrices
+SMOOTHING_METHODS = ("harmonic","polynomial")
+_smoothing_cache = {}
+
+# consecutive-day events found by stationEvents: (variable,comparison,threshold,peak) where peak is "max", "min" or
+# None (no peak value)
+EVENTS = {
+    'heat': ("high",">=",100.0,"max"),      # highs of 100 F or more
+    'freeze': ("low","<=",32.0,"min"),      # lows of 32 F or less
+    'dry': ("precip","==",0.0,None),        # days without precipitation (trace amounts are not dry)
+}
+
+# running records found by stationRecords: (variable,"max" or "min")
+RECORDS = {
+    'high_max': ("high","max"),     # record highs
+    'high_min': ("high","min"),     # record low maximums (coldest highs)
+    'low_max': ("low","max"),       # record high minimums (warmest lows)
+    'low_min': ("low","min"),       # record lows
+}
+
+# variables of a StationCube (last axis) and the files of a cube directory
+CUBE_VARIABLES = ("high","low","precip")
+CUBE_FILE = "cube.npy"
+CUBE_INDEX = "index.json"
+CUBE_LAYOUT = "date,station,year,variable"
+
+# columns of the table returned by groupedStats (followed by one column per requested percentile)
+STAT_COLUMNS = ("median","stdev","mean","max","min")
+
+# columns of the daily stats file (i.e. dfw_stats.csv, written without a header line) and the matching columns of
+# a groupedStats table with the lower and upper percentiles
+STATS_FILE_COLUMNS = ("date","high_median","high_mean","high_stdev","high_lower","high_upper","high_max","high_min",\
+    "low_median","low_mean","low_stdev","low_lower","low_upper","low_max","low_min")
+STATS_FILE_ORDER = [0,2,1,5,6,3,4]
+STATS_SCHEMA_VERSION = 1    # version of the layout of the binary stats file (see saveStats)
+
+# bootstrap confidence interval columns appended to the daily stats file rows by statsRows (bounds of the median,
+# lower and upper percentiles of the highs, then of the lows)
+STATS_FILE_CI_COLUMNS = tuple("%s_%s_ci_%s" % (variable,stat,bound) for variable in ("high","low") \
+    for stat in ("median","lower","upper") for bound in ("low","high"))
+
+# period definitions understood by periodKeys
+PERIODS = ("month","season","week","year","wateryear")
+MONTH_NAMES = ['January','February','March','April','May','June','July','August','September','October',\
+    'November','December']
+SEASON_NAMES = ['DJF','MAM','JJA','SON']
+
+# columns of the table returned by probabilityTable (stdevs are population values as in computeStats, variances
+# and covariance are sample values)
+PROBABILITY_COLUMNS = ("n","high_mean","high_stdev","low_mean","low_stdev","high_var","low_var","covariance")
+
+# results of batchProbabilities
+PROBABILITY_RESULTS = ("high_exceedance","high_nonexceedance","low_exceedance","low_nonexceedance","range",\
+    "high_rank","low_rank")
+
+# function for returning calendar day statistics (compatibility wrapper around calendarStats that returns the
+# version 2.0 tuple of dicts keyed by calendar date; all_highs and all_lows now hold array views)
 def climateStats(stats_file):
-    # open the CSV file
-    df = pandas.read_csv(stats_file)
-
-    # get the column values
-    dates = df['Date']
-    calendar_dates = df['Calendar date']
-    highs = df['High']
-    lows = df['Low']
-    precip = df['Precipitation']
-
-    # get all unique dates
-    unique_dates = calendar_dates.unique()
-
-    # compute the stats for each date
-    all_highs = {}
-    all_lows = {}
-    high_medians = {}
-    high_stdevs = {}
-    high_means = {}
-    high_max = {}
-    high_min = {}
-    low_medians = {}
-    low_stdevs = {}
-    low_means = {}
-    low_max = {}
-    low_min = {}
-    for key in unique_dates:
-        # get indicies matching date
-        indices = calendar_dates[calendar_dates[:]==key].index.tolist()
-        all_highs[key] = highs[indices]
-        all_lows[key] = lows[indices]
-        high_medians[key],high_stdevs[key],high_means[key],high_max[key],high_min[key] = computeStats(highs[indices])
-        low_medians[key],low_stdevs[key],low_means[key],low_max[key],low_min[key] = computeStats(lows[indices])
-
-    return dates,calendar_dates,high_medians,high_stdevs,high_means,high_max,high_min,low_medians,\
-        low_stdevs,low_means,low_max,low_min,highs,lows,all_highs,all_lows
+    import pandas
+    stats = calendarStats(stats_file)
+    data = stats.data
+    years,months,days = civilDates(data['ordinal'])
+    dates = pandas.Series(["%i/%i/%i" % date for date in zip(months,days,years)],name='Date')
+    calendar_dates = pandas.Series(np.array(CALENDAR_DATES)[data['doy']],name='Calendar date')
+
+    # only report dates that appear in the file
+    keys = [CALENDAR_DATES[x] for x in np.flatnonzero(stats.counts)]
+    columns = {}
+    for name in stats.columns:
+        column = stats.table[:,stats.columns.index(name)]
+        columns[name] = dict((key,column[DATE_INDEX[key]]) for key in keys)
+    all_highs = dict((key,stats.dateHighs(key)) for key in keys)
+    all_lows = dict((key,stats.dateLows(key)) for key in keys)
+
+    return dates,calendar_dates,columns['high_median'],columns['high_stdev'],columns['high_mean'],\
+        columns['high_max'],columns['high_min'],columns['low_median'],columns['low_stdev'],columns['low_mean'],\
+        columns['low_max'],columns['low_min'],pandas.Series(data['high'],name='High'),\
+        pandas.Series(data['low'],name='Low'),all_highs,all_lows
+
+# function for returning calendar day statistics as a CalendarStats table
+def calendarStats(stats_file,percentiles=(),window=0):
+    data = loadStation(stats_file)
+    return CalendarStats(data['doy'],data['high'],data['low'],percentiles,data=data,window=window)
+
+# per calendar date statistics for a single station. The stats are kept in a 366 x N float array (table, with
+# column names in columns) whose rows follow CALENDAR_DATES, and the observations are grouped by calendar date so
+# that each date's highs and lows are contiguous (chronological) slices of the highs and lows arrays. With a window,
+# the stats, histograms and probability table of every date pool the dates within +-window days (whole-degree data
+# only); dateHighs and dateLows still return the observations of the date itself.
+class CalendarStats(object):
+    def __init__(self,calendar_dates,highs,lows,percentiles=(),data=None,window=0):
+        # calendar dates may be given as MM/DD strings or as rows of CALENDAR_DATES
+        calendar_dates = np.asarray(calendar_dates)
+        if calendar_dates.dtype.kind not in "iu":
+            calendar_dates = calendarIndex(calendar_dates)
+
+        self.data = data
+        self.percentiles = list(percentiles)
+        self.window = int(window)
+        self._histograms = None
+        self._probability_table = None
+        self.offsets,(self.highs,self.lows) = groupByKey(calendar_dates,\
+            [np.asarray(highs,dtype=float),np.asarray(lows,dtype=float)])
+        self.counts = np.diff(self.offsets)
+
+        names = list(STAT_COLUMNS) + ["p%g" % q for q in self.percentiles]
+        self.columns = ["high_" + name for name in names] + ["low_" + name for name in names]
+        if self.window:
+            self.table = np.hstack([hist.stats(self.percentiles) for hist in self.histograms()])
+        else:
+            self.table = np.hstack([groupedStats(self.offsets,self.highs,self.percentiles),\
+                groupedStats(self.offsets,self.lows,self.percentiles)])
+
+    # row of the table for a calendar date (MM/DD)
+    def row(self,date):
+        return DATE_INDEX[date]
+
+    # value of a single statistic (i.e. "high_mean") for a calendar date
+    def stat(self,name,date):
+        return self.table[DATE_INDEX[date],self.columns.index(name)]
+
+    # all high temperatures observed on a calendar date (a view, not a copy)
+    def dateHighs(self,date):
+        x = DATE_INDEX[date]
+        return self.highs[self.offsets[x]:self.offsets[x+1]]
+
+    # all low temperatures observed on a calendar date (a view, not a copy)
+    def dateLows(self,date):
+        x = DATE_INDEX[date]
+        return self.lows[self.offsets[x]:self.offsets[x+1]]
+
+    # whole-degree histograms of the highs and lows, pooled over the window (built on first use)
+    def histograms(self):
+        if self._histograms is None:
+            rows = np.repeat(np.arange(len(self.counts)),self.counts)
+            self._histograms = (DateHistograms.fromValues(rows,self.highs).window(self.window),\
+                DateHistograms.fromValues(rows,self.lows).window(self.window))
+        return self._histograms
+
+    # per date distribution parameters for probability queries (built on first use)
+    def probabilityTable(self):
+        if self._probability_table is None:
+            rows = np.repeat(np.arange(len(self.counts)),self.counts)
+            self._probability_table = probabilityTable(rows,self.highs,self.lows,window=self.window)
+        return self._probability_table
 
 # compute various statistics for a dataset
 def computeStats(dataset):
     return np.median(dataset),np.std(dataset),np.mean(dataset),np.max(dataset),np.min(dataset)
+
+# sums of the rows of array (one row per calendar date) over a circular window of +-window rows around every row,
+# from differences of a cumulative sum, so the cost does not depend on the window. The window wraps from 12/31 to
+# 01/01 and, since rows are calendar dates, always includes 02/29 when it spans the end of February.
+def circularWindowSums(array,window):
+    array = np.asarray(array)
+    nrows = len(array)
+    if 2 * window + 1 > nrows:
+        raise ValueError("window of +-%i rows is longer than the %i rows" % (window,nrows))
+    extended = np.concatenate([array[nrows - window:],array,array[:window]]) if window else array
+    cumulative = np.zeros((len(extended) + 1,) + array.shape[1:],dtype=np.result_type(array.dtype,np.int64))
+    np.cumsum(extended,axis=0,out=cumulative[1:])
+    return cumulative[2 * window + 1:] - cumulative[:nrows]
+
+# groups (offsets and values from groupByKey, one group per calendar date) pooled with the groups within +-window
+# rows around every group, wrapping around like circularWindowSums. Every value appears in 2 * window + 1 pooled
+# groups. Returns (offsets,values) of the pooled groups.
+def circularWindowGroups(offsets,values,window):
+    offsets = np.asarray(offsets,dtype=np.int64)
+    values = np.asarray(values)
+    counts = np.diff(offsets)
+    nrows = len(counts)
+    pooled_offsets = np.concatenate(([0],np.cumsum(circularWindowSums(counts,window))))
+    # the member rows of every pooled group, then the index of every value of those rows
+    members = ((np.arange(nrows)[:,None] + np.arange(-window,window + 1)[None,:]) % nrows).ravel()
+    lengths = counts[members]
+    starts = offsets[members] - np.concatenate(([0],np.cumsum(lengths)[:-1]))
+    return pooled_offsets,values[np.repeat(starts,lengths) + np.arange(lengths.sum())]
+
+# map calendar date strings (MM/DD) to their row in CALENDAR_DATES
+def calendarIndex(calendar_dates):
+    # only the unique labels are looked up, everything else is integer indexing
+    labels,inverse = np.unique(np.asarray(calendar_dates,dtype=str),return_inverse=True)
+    lookup = np.array([DATE_INDEX[label] for label in labels],dtype=np.int64)
+    return lookup[inverse.ravel()]
+
+# sort fields into contiguous per-group blocks (chronological order is kept within each group)
+@profiling.profiled("group",rows_arg=0)
+def groupByKey(keys,fields,ngroups=len(CALENDAR_DATES)):
+    keys = np.asarray(keys)
+    order = np.argsort(keys,kind="mergesort")
+    offsets = np.concatenate(([0],np.cumsum(np.bincount(keys,minlength=ngroups))))
+    return offsets,[np.asarray(field)[order] for field in fields]
+
+# compute the median, standard deviation, mean, max, min and percentiles of every group in one pass. offsets and
+# values come from groupByKey. Returns one row per group with the STAT_COLUMNS followed by one column per
+# percentile (missing values are skipped; groups without any values are NaN).
+@profiling.profiled("stats",rows_arg=1)
+def groupedStats(offsets,values,percentiles=()):
+    values = np.asarray(values,dtype=float)
+    counts = np.diff(offsets)
+    ngroups = len(counts)
+    group_ids = np.repeat(np.arange(ngroups),counts)
+    present = ~np.isnan(values)
+    present_counts = np.bincount(group_ids[present],minlength=ngroups)
+    valid = present_counts > 0
+    table = np.full((ngroups,len(STAT_COLUMNS)+len(percentiles)),np.nan)
+    if not valid.any():
+        return table
+
+    # sort the values within each group (missing values sort to the end of their group)
+    ordered = values[np.lexsort((values,group_ids))]
+    first = offsets[:-1][valid]
+    n = present_counts[valid]
+    last = first + n - 1
+
+    # moments
+    values = np.where(present,values,0.0)
+    all_means = np.bincount(group_ids,weights=values,minlength=ngroups) / np.maximum(present_counts,1)
+    means = all_means[valid]
+    deviations = np.where(present,values - np.repeat(all_means,counts),0.0)
+    stdevs = np.sqrt(np.bincount(group_ids,weights=deviations**2,minlength=ngroups)[valid] / n)
+
+    # order statistics (linear interpolation, same as np.percentile)
+    def percentile(q):
+        position = (q / 100.0) * (n - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1,n - 1)
+        fraction = position - lower
+        below = ordered[first + lower]
+        above = ordered[first + upper]
+        return below + (above - below) * fraction
+
+    table[valid,0] = percentile(50.0)
+    table[valid,1] = stdevs
+    table[valid,2] = means
+    table[valid,3] = ordered[last]
+    table[valid,4] = ordered[first]
+    for i,q in enumerate(percentiles):
+        table[valid,len(STAT_COLUMNS)+i] = percentile(float(q))
+
+    return table
+
+# convert year/month/day arrays into proleptic Gregorian day ordinals (same as datetime.date.toordinal)
+def dateOrdinals(years,months,days):
+    years = np.asarray(years,dtype=np.int64)
+    months = np.asarray(months,dtype=np.int64)
+    days = np.asarray(days,dtype=np.int64)
+    # days since 1970-01-01 (civil calendar algorithm with years starting in March)
+    years = years - (months <= 2)
+    era = np.floor_divide(years,400)
+    year_of_era = years - era * 400
+    day_of_year = (153 * (months + np.where(months > 2,-3,9)) + 2) // 5 + days - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468 + ORDINAL_1970
+
+# convert day ordinals back into year, month and day arrays
+def civilDates(ordinals):
+    days = (np.asarray(ordinals,dtype=np.int64) - ORDINAL_1970).astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    months = days.astype("datetime64[M]")
+    return years.astype(np.int64) + 1970,(months - years).astype(np.int64) + 1,(days - months).astype(np.int64) + 1
+
+# row of CALENDAR_DATES for month/day arrays (leap day always has its own row)
+def calendarRows(months,days):
+    return MONTH_START[np.asarray(months) - 1] + np.asarray(days) - 1
+
+# parse a station CSV file into columns. Three layouts are understood:
+#   Date,Calendar date,High,Low,Precipitation (i.e. dfw.csv, dates as M/D/YYYY)
+#   dates,highs,lows,precip (i.e. dfw_final.csv, dates as M/DD/YYYY and "T" for trace precipitation)
+#   date,high,low,precip with no header line (raw input of date_converter.py, dates as MMDDYYYY)
+def parseStation(climo_file):
+    import pandas
+    with open(climo_file,"r") as f:
+        first_line = f.readline()
+
+    if first_line[:1].isdigit() and "/" not in first_line.split(",")[0]:
+        df = pandas.read_csv(climo_file,header=None,names=['date','high','low','precip'],\
+            dtype={'date':np.int64,'precip':str})
+        stamps = df['date'].values
+        months,days,years = stamps // 1000000,(stamps // 10000) % 100,stamps % 10000
+    else:
+        df = pandas.read_csv(climo_file,dtype=str)
+        if len(df.columns) == 4:
+            df.columns = ['date','high','low','precip']
+        else:
+            df.columns = ['date','calendar','high','low','precip']
+        parts = df['date'].str.split("/",expand=True).astype(np.int64).values
+        months,days,years = parts[:,0],parts[:,1],parts[:,2]
+
+    return {
+        'ordinal': dateOrdinals(years,months,days).astype(np.int32),
+        'month': months.astype(np.int8),
+        'doy': calendarRows(months,days).astype(np.int16),
+        'high': pandas.to_numeric(df['high'],errors='coerce').values.astype(float),
+        'low': pandas.to_numeric(df['low'],errors='coerce').values.astype(float),
+        'precip': parsePrecip(df['precip']),
+    }
+
+# convert precipitation strings into floats ("T" becomes TRACE, missing values become NaN)
+def parsePrecip(precip):
+    import pandas
+    precip = pandas.Series(precip,dtype=str).str.strip()
+    values = pandas.to_numeric(precip,errors='coerce').values.astype(float)
+    values[(precip == "T").values] = TRACE
+    return values
+
+# fingerprint of a file's contents
+def fileHash(path,blocksize=1<<20):
+    digest = hashlib.sha1()
+    with open(path,"rb") as f:
+        block = f.read(blocksize)
+        while block:
+            digest.update(block)
+            block = f.read(blocksize)
+    return digest.hexdigest()
+
+# load a station CSV file as a dict of column arrays (see CACHE_COLUMNS). The first load parses the text file and
+# stores each column as a .npy file in CACHE_DIR next to it. Later loads memory-map those files as long as the
+# source file has the same size and either the same mtime or (if it was touched) the same content hash.
+def loadStation(climo_file,cache=True):
+    with profiling.stage("load") as s:
+        data = _loadStation(climo_file,cache)
+        s.rows = len(data['ordinal'])
+    return data
+
+def _loadStation(climo_file,cache):
+    if not cache:
+        return parseStation(climo_file)
+
+    source = os.path.abspath(climo_file)
+    cache_dir = stationCacheDir(source)
+    meta_file = os.path.join(cache_dir,"meta.json")
+    info = os.stat(source)
+
+    # check the cache against the source file
+    meta = None
+    if os.path.exists(meta_file):
+        with open(meta_file,"r") as f:
+            meta = json.load(f)
+        if meta.get('columns') != list(CACHE_COLUMNS) or meta.get('size') != info.st_size:
+            meta = None
+        elif meta.get('mtime') != info.st_mtime:
+            if meta.get('sha1') != fileHash(source):
+                meta = None
+            else:
+                meta['mtime'] = info.st_mtime
+                try:
+                    writeJSON(meta_file,meta)
+                except OSError:
+                    pass
+
+    if meta is not None:
+        return dict((name,np.load(os.path.join(cache_dir,name + ".npy"),mmap_mode="r")) for name in CACHE_COLUMNS)
+
+    # (re)build the cache; the metadata is written last so that an interrupted build is never used
+    # (each file is written under a temporary name and renamed, so concurrent builds never see partial files).
+    # If the cache cannot be written (i.e. a read-only station directory), the parsed data is used uncached.
+    data = parseStation(source)
+    try:
+        try:
+            os.makedirs(cache_dir)
+        except OSError:
+            if not os.path.isdir(cache_dir):
+                raise
+        try:
+            os.remove(meta_file)
+        except OSError:
+            pass
+        for name in CACHE_COLUMNS:
+            temp = os.path.join(cache_dir,"%s.%i.tmp.npy" % (name,os.getpid()))
+            np.save(temp,data[name])
+            os.rename(temp,os.path.join(cache_dir,name + ".npy"))
+        writeJSON(meta_file,{'columns':list(CACHE_COLUMNS),'size':info.st_size,'mtime':info.st_mtime,\
+            'sha1':fileHash(source),'rows':len(data['ordinal'])})
+    except OSError:
+        pass
+    return data
+
+# directory of the binary cache of a station file (see loadStation)
+def stationCacheDir(climo_file):
+    source = os.path.abspath(climo_file)
+    return os.path.join(os.path.dirname(source),CACHE_DIR,os.path.basename(source))
+
+# probability table and whole-degree histograms of a station pooled over +-window days, as returned by the
+# probabilityTable and histograms methods of calendarStats(climo_file,window=window). They are stored in the
+# station's cache directory and reused while the station file is unchanged, so that a single probability lookup
+# only reads a few small arrays. Returns (table,high_hist,low_hist); the histograms are None (and nothing is
+# cached) if the temperatures are not whole degrees. Without a station cache (see loadStation) nothing is cached.
+def probabilityTables(climo_file,window=0):
+    data = loadStation(climo_file)
+    cache_dir = stationCacheDir(climo_file)
+    try:
+        with open(os.path.join(cache_dir,"meta.json"),"r") as f:
+            sha1 = json.load(f)['sha1']
+    except (OSError,ValueError,KeyError):
+        sha1 = None
+    tables_file = os.path.join(cache_dir,"probability_%i.npz" % window)
+    if sha1 is not None and os.path.exists(tables_file):
+        with np.load(tables_file) as archive:
+            if str(archive['sha1']) == sha1 and 'version' in archive.files and archive['version'] == TABLES_VERSION:
+                return archive['table'],DateHistograms(archive['high_counts'],archive['high_tmin']),\
+                    DateHistograms(archive['low_counts'],archive['low_tmin'])
+
+    stats = CalendarStats(data['doy'],data['high'],data['low'],data=data,window=window)
+    table = stats.probabilityTable()
+    try:
+        high_hist,low_hist = stats.histograms()
+    except ValueError:
+        return table,None,None
+    if sha1 is not None:
+        temp = os.path.join(cache_dir,"probability_%i.%i.tmp.npz" % (window,os.getpid()))
+        try:
+            np.savez(temp,sha1=sha1,version=TABLES_VERSION,table=table,high_counts=high_hist.counts,\
+                high_tmin=high_hist.tmin,low_counts=low_hist.counts,low_tmin=low_hist.tmin)
+            os.rename(temp,tables_file)
+        except OSError:
+            pass
+    return table,high_hist,low_hist
+
+# write a JSON file by replacing it atomically
+def writeJSON(path,obj):
+    temp = "%s.%i.tmp" % (path,os.getpid())
+    with open(temp,"w") as f:
+        json.dump(obj,f)
+    os.rename(temp,path)
+
+# per calendar date histograms of whole-degree temperatures. counts[row,t-tmin] is the number of observations of
+# temperature t on CALENDAR_DATES[row]. All statistics are exact and cost O(bins) per date, and histograms for
+# different dates, periods or stations can be pooled by adding their counts.
+class DateHistograms(object):
+    def __init__(self,counts,tmin):
+        self.counts = np.asarray(counts,dtype=np.int64)
+        self.tmin = int(tmin)
+        self.temps = np.arange(self.tmin,self.tmin + self.counts.shape[1])
+        self.cumulative = np.cumsum(self.counts,axis=1)
+        self.n = self.cumulative[:,-1]
+
+    # build the histograms with a single bincount over the whole record (missing values are skipped)
+    @classmethod
+    @profiling.profiled("group",rows_arg=1)
+    def fromValues(cls,rows,values,ngroups=len(CALENDAR_DATES),temp_range=TEMP_RANGE):
+        rows = np.asarray(rows,dtype=np.int64)
+        values = np.asarray(values,dtype=float)
+        present = ~np.isnan(values)
+        rows,values = rows[present],values[present]
+        temps = np.rint(values).astype(np.int64)
+        if np.any(temps != values):
+            raise ValueError("DateHistograms requires whole-degree temperatures")
+
+        tmin = min(temp_range[0],temps.min()) if len(temps) else temp_range[0]
+        tmax = max(temp_range[1],temps.max()) if len(temps) else temp_range[1]
+        nbins = tmax - tmin + 1
+        counts = np.bincount(rows * nbins + (temps - tmin),minlength=ngroups * nbins).reshape(ngroups,nbins)
+        return cls(counts,tmin)
+
+    # pool two sets of histograms (i.e. two stations or two periods)
+    def __add__(self,other):
+        tmin = min(self.tmin,other.tmin)
+        tmax = max(self.tmin + self.counts.shape[1],other.tmin + other.counts.shape[1])
+        counts = np.zeros((max(len(self.counts),len(other.counts)),tmax - tmin),dtype=np.int64)
+        for hist in (self,other):
+            start = hist.tmin - tmin
+            counts[:len(hist.counts),start:start + hist.counts.shape[1]] += hist.counts
+        return DateHistograms(counts,tmin)
+
+    # histograms of every date pooled with the dates within +-window days (wrapping around the new year)
+    def window(self,window):
+        return DateHistograms(circularWindowSums(self.counts,window),self.tmin) if window else self
+
+    # histograms of a subset of rows summed into a single row (i.e. a window of dates)
+    def pool(self,rows):
+        return DateHistograms(self.counts[rows].sum(axis=0,keepdims=True),self.tmin)
+
+    # percentile (linear interpolation, same as np.percentile) for every row
+    def percentile(self,q):
+        result = np.full(len(self.n),np.nan)
+        valid = self.n > 0
+        position = (q / 100.0) * (self.n[valid] - 1)
+        lower = np.floor(position).astype(np.int64)
+        below = self._ranked_rows(valid,lower)
+        above = self._ranked_rows(valid,np.minimum(lower + 1,self.n[valid] - 1))
+        result[valid] = below + (above - below) * (position - lower)
+        return result
+
+    # value with the given (0-based) rank in each of the selected rows
+    def _ranked_rows(self,rows,ranks):
+        return self.tmin + np.sum(self.cumulative[rows] <= ranks[:,None],axis=1)
+
+    def median(self):
+        return self.percentile(50.0)
+
+    def mean(self):
+        with np.errstate(invalid="ignore",divide="ignore"):
+            return np.dot(self.counts,self.temps) / self.n
+
+    # population standard deviation (same as np.std)
+    def stdev(self):
+        mean = self.mean()
+        with np.errstate(invalid="ignore",divide="ignore"):
+            return np.sqrt(np.sum(self.counts * (self.temps[None,:] - mean[:,None])**2,axis=1) / self.n)
+
+    # record maximum and minimum of every row
+    def max(self):
+        result = np.full(len(self.n),np.nan)
+        valid = self.n > 0
+        result[valid] = self.temps[-1] - np.argmax(self.counts[valid,::-1] > 0,axis=1)
+        return result
+
+    def min(self):
+        result = np.full(len(self.n),np.nan)
+        valid = self.n > 0
+        result[valid] = self.temps[0] + np.argmax(self.counts[valid] > 0,axis=1)
+        return result
+
+    # same table as groupedStats (STAT_COLUMNS followed by the requested percentiles)
+    def stats(self,percentiles=()):
+        columns = [self.median(),self.stdev(),self.mean(),self.max(),self.min()]
+        columns += [self.percentile(float(q)) for q in percentiles]
+        return np.column_stack(columns)
+
+    # percentile rank of scores on the given rows, equivalent to scipy.stats.percentileofscore(kind="mean")
+    def percentileRank(self,rows,scores):
+        rows = np.asarray(rows,dtype=np.int64)
+        scores = np.asarray(scores,dtype=float)
+        nbins = self.counts.shape[1]
+        # scores that are not finite have no rank (NaN); they are replaced by 0 for the lookups below
+        finite = np.isfinite(scores)
+        scores = np.where(finite,scores,0.0)
+
+        # number of values strictly below and at or below each score
+        def countAtOrBelow(temps):
+            index = temps.astype(np.int64) - self.tmin
+            counts = self.cumulative[rows,np.clip(index,0,nbins - 1)]
+            return np.where(index < 0,0,counts)
+        strict = countAtOrBelow(np.ceil(scores) - 1)
+        weak = countAtOrBelow(np.floor(scores))
+
+        with np.errstate(invalid="ignore",divide="ignore"):
+            return np.where(finite,(strict + weak) * 50.0 / self.n[rows],np.nan)
+
+# bivariate standard normal CDF P(X <= h, Y <= k) with correlation rho, computed in closed form with Owen's T
+# function (vectorized, deterministic)
+def bivariateNormalCDF(h,k,rho):
+    from scipy import special
+    h,k,rho = np.broadcast_arrays(np.asarray(h,dtype=float),np.asarray(k,dtype=float),\
+        np.clip(np.asarray(rho,dtype=float),-1.0 + 1e-12,1.0 - 1e-12))
+    # an infinite limit reduces to the univariate CDF of the other limit (P(X <= inf, Y <= k) = P(Y <= k), and 0 for
+    # a limit of -inf), i.e. for a date whose standard deviation is 0; those limits are replaced by 1 below so that
+    # Owen's T function only sees finite arguments
+    infinite = np.isinf(h) | np.isinf(k)
+    univariate = special.ndtr(np.minimum(h,k))
+    h = np.where(infinite,1.0,h)
+    k = np.where(infinite,1.0,k)
+    # zero limits are nudged so that the sign tests and Owen's T arguments stay finite
+    h = np.where(h == 0,1e-300,h)
+    k = np.where(k == 0,1e-300,k)
+    root = np.sqrt(1.0 - rho**2)
+    with np.errstate(over="ignore"):
+        ah = (k - rho * h) / (h * root)
+        ak = (h - rho * k) / (k * root)
+    delta = np.where(np.signbit(h) == np.signbit(k),0.0,0.5)
+    bivariate = 0.5 * special.ndtr(h) + 0.5 * special.ndtr(k) - special.owens_t(h,ah) - special.owens_t(k,ak) - delta
+    return np.where(infinite,univariate,bivariate)
+
+# probability that the high stays below high and the low stays above low, P(high < H and low > L), for a
+# bivariate normal distribution of highs and lows (all arguments broadcast against each other)
+def rangeProbability(high_mean,low_mean,high_var,low_var,covariance,high,low):
+    from scipy import special
+    high_sd = np.sqrt(high_var)
+    low_sd = np.sqrt(low_var)
+    # a standard deviation of 0 gives infinite limits (see bivariateNormalCDF)
+    with np.errstate(invalid="ignore",divide="ignore"):
+        h = (np.asarray(high,dtype=float) - high_mean) / high_sd
+        l = (np.asarray(low,dtype=float) - low_mean) / low_sd
+        rho = covariance / (high_sd * low_sd)
+    return np.clip(special.ndtr(h) - bivariateNormalCDF(h,l,rho),0.0,1.0)
+
+# Monte Carlo estimate of rangeProbability (for cross-checking), using a seeded generator
+def monteCarloRangeProbability(mean,covariance,high,low,samples=10000,seed=None):
+    draws = np.random.default_rng(seed).multivariate_normal(mean,covariance,samples)
+    return np.mean((draws[:,0] < high) & (draws[:,1] > low))
+
+# per calendar date means, standard deviations and high/low covariance (see PROBABILITY_COLUMNS), computed once so
+# that probability queries are just table lookups. window pools the observations of the calendar dates within
+# +-window days of each date (from windowed moment sums, see circularWindowSums). Only days with both a high and a
+# low are used, so the means, variances and covariance of a date all come from the same observations.
+@profiling.profiled("probability",rows_arg=0)
+def probabilityTable(rows,highs,lows,ngroups=len(CALENDAR_DATES),window=0):
+    rows = np.asarray(rows,dtype=np.int64)
+    highs = np.asarray(highs,dtype=float)
+    lows = np.asarray(lows,dtype=float)
+    paired = ~np.isnan(highs) & ~np.isnan(lows)
+    rows,highs,lows = rows[paired],highs[paired],lows[paired]
+    if window:
+        return _windowedProbabilityTable(rows,highs,lows,ngroups,window)
+    n = np.bincount(rows,minlength=ngroups).astype(float)
+    with np.errstate(invalid="ignore",divide="ignore"):
+        high_mean = np.bincount(rows,weights=highs,minlength=ngroups) / n
+        low_mean = np.bincount(rows,weights=lows,minlength=ngroups) / n
+        high_dev = highs - high_mean[rows]
+        low_dev = lows - low_mean[rows]
+        high_ss = np.bincount(rows,weights=high_dev**2,minlength=ngroups)
+        low_ss = np.bincount(rows,weights=low_dev**2,minlength=ngroups)
+        cross = np.bincount(rows,weights=high_dev*low_dev,minlength=ngroups)
+        sample = np.where(n > 1,n - 1.0,np.nan)
+        return np.column_stack([n,high_mean,np.sqrt(high_ss / n),low_mean,np.sqrt(low_ss / n),high_ss / sample,\
+            low_ss / sample,cross / sample])
+
+# probabilityTable from the moment sums of every date pooled over +-window days. The values are centered on their
+# overall means first, so the sums of squares of whole-degree data stay exact.
+def _windowedProbabilityTable(rows,highs,lows,ngroups,window):
+    high_center,low_center = np.mean(highs),np.mean(lows)
+    highs = highs - high_center
+    lows = lows - low_center
+    sums = np.column_stack([np.bincount(rows,weights=weights,minlength=ngroups) for weights in \
+        (np.ones(len(rows)),highs,lows,highs**2,lows**2,highs*lows)])
+    n,high_sum,low_sum,high_sq,low_sq,cross_sum = circularWindowSums(sums,window).T
+    with np.errstate(invalid="ignore",divide="ignore"):
+        high_mean = high_sum / n
+        low_mean = low_sum / n
+        high_ss = np.maximum(high_sq - n * high_mean**2,0.0)
+        low_ss = np.maximum(low_sq - n * low_mean**2,0.0)
+        cross = cross_sum - n * high_mean * low_mean
+        sample = np.where(n > 1,n - 1.0,np.nan)
+        return np.column_stack([n,high_center + high_mean,np.sqrt(high_ss / n),low_center + low_mean,\
+            np.sqrt(low_ss / n),high_ss / sample,low_ss / sample,cross / sample])
+
+# exceedance, non-exceedance, within-range probabilities and percentile ranks for many (date,high,low) queries at
+# once. rows are rows of CALENDAR_DATES and table comes from probabilityTable. Percentile ranks need the
+# DateHistograms of the highs and lows (NaN otherwise). Returns a dict of arrays keyed by PROBABILITY_RESULTS.
+@profiling.profiled("probability",rows_arg=1)
+def batchProbabilities(table,rows,highs,lows,high_hist=None,low_hist=None):
+    from scipy import special
+    rows = np.asarray(rows,dtype=np.int64)
+    highs = np.asarray(highs,dtype=float)
+    lows = np.asarray(lows,dtype=float)
+    params = dict((name,table[rows,i]) for i,name in enumerate(PROBABILITY_COLUMNS))
+
+    with np.errstate(invalid="ignore",divide="ignore"):
+        high_below = special.ndtr((highs - params['high_mean']) / params['high_stdev'])
+        low_below = special.ndtr((lows - params['low_mean']) / params['low_stdev'])
+        results = {
+            'high_exceedance': 1.0 - high_below,
+            'high_nonexceedance': high_below,
+            'low_exceedance': 1.0 - low_below,
+            'low_nonexceedance': low_below,
+            'range': rangeProbability(params['high_mean'],params['low_mean'],params['high_var'],params['low_var'],\
+                params['covariance'],highs,lows),
+        }
+    nan = np.full(len(rows),np.nan)
+    results['high_rank'] = high_hist.percentileRank(rows,highs) if high_hist is not None else nan
+    results['low_rank'] = low_hist.percentileRank(rows,lows) if low_hist is not None else nan
+    return results
+
+# integer group keys for a period definition (see PERIODS), returned as (keys,labels) where keys index into labels.
+# Seasons are meteorological (DJF,MAM,JJA,SON), weeks are ISO weeks and water years run from October through
+# September and are labeled by the year they end in.
+def periodKeys(ordinals,period):
+    ordinals = np.asarray(ordinals,dtype=np.int64)
+    years,months,days = civilDates(ordinals)
+    if period == "month":
+        return months - 1,list(MONTH_NAMES)
+    elif period == "season":
+        return (months % 12) // 3,list(SEASON_NAMES)
+    elif period == "week":
+        # the ISO week belongs to the year of its Thursday
+        thursdays = ordinals - (ordinals - 1) % 7 + 3
+        first_days = dateOrdinals(civilDates(thursdays)[0],1,1)
+        return (thursdays - first_days) // 7,["W%02i" % week for week in range(1,54)]
+    elif period in ("year","wateryear"):
+        if period == "wateryear":
+            years = years + (months >= 10)
+        first = years.min() if len(years) else 0
+        last = years.max() if len(years) else -1
+        return years - first,[str(year) for year in range(first,last + 1)]
+    else:
+        raise ValueError("unknown period: %s (expected one of %s)" % (period,", ".join(PERIODS)))
+
+# stats of values for every group of each requested period, computed with one grouped pass per period. Returns a
+# dict of pandas DataFrames keyed by period with the columns Period, Count, the STAT_COLUMNS and one pN column per
+# percentile. Missing values are skipped.
+def periodStats(ordinals,values,periods=("month",),percentiles=(10,90)):
+    import pandas
+    ordinals = np.asarray(ordinals,dtype=np.int64)
+    values = np.asarray(values,dtype=float)
+    present = ~np.isnan(values)
+    ordinals,values = ordinals[present],values[present]
+
+    tables = {}
+    for period in periods:
+        keys,labels = periodKeys(ordinals,period)
+        offsets,(grouped,) = groupByKey(keys,[values],len(labels))
+        table = groupedStats(offsets,grouped,percentiles)
+        df = pandas.DataFrame(table,columns=list(STAT_COLUMNS) + ["p%g" % q for q in percentiles])
+        df.insert(0,'Count',np.diff(offsets))
+        df.insert(0,'Period',labels)
+        tables[period] = df
+    return tables
+
+# persistent per calendar date accumulators (counts, sums, sums of squares, whole-degree histograms and records
+# with the year they were set) for the highs and lows of a station. update() only applies observations newer than
+# the last one already applied, so new daily data can be added without recomputing the full record.
+class ClimatologyAccumulator(object):
+    variables = ("high","low")
+
+    def __init__(self,temp_range=TEMP_RANGE):
+        ngroups = len(CALENDAR_DATES)
+        self.tmin = temp_range[0]
+        nbins = temp_range[1] - temp_range[0] + 1
+        self.first_ordinal = 0
+        self.last_ordinal = 0
+        self.arrays = {}
+        for name in self.variables:
+            self.arrays[name + "_counts"] = np.zeros((ngroups,nbins),dtype=np.int64)
+            self.arrays[name + "_n"] = np.zeros(ngroups,dtype=np.int64)
+            self.arrays[name + "_sum"] = np.zeros(ngroups)
+            self.arrays[name + "_sumsq"] = np.zeros(ngroups)
+            self.arrays[name + "_max"] = np.full(ngroups,np.nan)
+            self.arrays[name + "_max_year"] = np.zeros(ngroups,dtype=np.int64)
+            self.arrays[name + "_min"] = np.full(ngroups,np.nan)
+            self.arrays[name + "_min_year"] = np.zeros(ngroups,dtype=np.int64)
+
+    @classmethod
+    def load(cls,state_file):
+        accumulator = cls()
+        with np.load(state_file) as state:
+            accumulator.tmin = int(state['tmin'])
+            accumulator.first_ordinal = int(state['first_ordinal'])
+            accumulator.last_ordinal = int(state['last_ordinal'])
+            accumulator.arrays = dict((name,state[name]) for name in state.files \
+                if name not in ("tmin","first_ordinal","last_ordinal"))
+        return accumulator
+
+    def save(self,state_file):
+        # written under a temporary name first so that an interrupted save never corrupts the state
+        temp = "%s.%i.tmp.npz" % (os.path.splitext(state_file)[0],os.getpid())
+        np.savez(temp,tmin=self.tmin,first_ordinal=self.first_ordinal,last_ordinal=self.last_ordinal,**self.arrays)
+        os.rename(temp,state_file)
+
+    # widen the histograms so that they cover tmin..tmax
+    def _extend(self,tmin,tmax):
+        nbins = self.arrays['high_counts'].shape[1]
+        below = max(0,self.tmin - tmin)
+        above = max(0,tmax - (self.tmin + nbins - 1))
+        if below or above:
+            for name in self.variables:
+                self.arrays[name + "_counts"] = np.pad(self.arrays[name + "_counts"],((0,0),(below,above)),"constant")
+            self.tmin -= below
+
+    # apply the observations newer than the last update. Returns a boolean array with one element per row of
+    # CALENDAR_DATES that is True where the stats changed.
+    def update(self,ordinals,rows,highs,lows):
+        ordinals = np.asarray(ordinals,dtype=np.int64)
+        rows = np.asarray(rows,dtype=np.int64)
+        ngroups = len(CALENDAR_DATES)
+        changed = np.zeros(ngroups,dtype=bool)
+        new = ordinals > self.last_ordinal
+        if not new.any():
+            return changed
+
+        for name,values in zip(self.variables,(highs,lows)):
+            values = np.asarray(values,dtype=float)
+            present = new & ~np.isnan(values)
+            if not present.any():
+                continue
+            new_ordinals,new_rows,new_values = ordinals[present],rows[present],values[present]
+            temps = np.rint(new_values).astype(np.int64)
+            if np.any(temps != new_values):
+                raise ValueError("ClimatologyAccumulator requires whole-degree temperatures")
+
+            # histograms and moments
+            self._extend(temps.min(),temps.max())
+            nbins = self.arrays[name + "_counts"].shape[1]
+            self.arrays[name + "_counts"] += np.bincount(new_rows * nbins + (temps - self.tmin),\
+                minlength=ngroups * nbins).reshape(ngroups,nbins)
+            self.arrays[name + "_n"] += np.bincount(new_rows,minlength=ngroups)
+            self.arrays[name + "_sum"] += np.bincount(new_rows,weights=new_values,minlength=ngroups)
+            self.arrays[name + "_sumsq"] += np.bincount(new_rows,weights=new_values**2,minlength=ngroups)
+
+            # records (ties do not set a record, so the first year to reach a record keeps it, as in RecordIndex)
+            years = civilDates(new_ordinals)[0]
+            for kind,sign in (("max",1.0),("min",-1.0)):
+                order = np.lexsort((-new_ordinals,sign * new_values,new_rows))
+                sorted_rows = new_rows[order]
+                last = order[np.append(sorted_rows[1:] != sorted_rows[:-1],True)]
+                date_rows = new_rows[last]
+                record = self.arrays[name + "_" + kind][date_rows]
+                better = np.isnan(record) | (sign * new_values[last] > sign * record)
+                self.arrays[name + "_" + kind][date_rows[better]] = new_values[last][better]
+                self.arrays[name + "_" + kind + "_year"][date_rows[better]] = years[last][better]
+
+            changed[new_rows] = True
+
+        if not self.first_ordinal:
+            self.first_ordinal = int(ordinals[new].min())
+        self.last_ordinal = int(ordinals[new].max())
+        return changed
+
+    # whole-degree histograms of a variable ("high" or "low")
+    def histograms(self,name):
+        return DateHistograms(self.arrays[name + "_counts"],self.tmin)
+
+    # per date stats of a variable (same columns as groupedStats)
+    # (the standard deviation comes from the histograms rather than the sums of squares so that it matches a full
+    # recomputation to the last digit)
+    def stats(self,name,percentiles=()):
+        with np.errstate(invalid="ignore",divide="ignore"):
+            mean = self.arrays[name + "_sum"] / self.arrays[name + "_n"]
+        hist = self.histograms(name)
+        columns = [hist.median(),hist.stdev(),mean,self.arrays[name + "_max"],self.arrays[name + "_min"]]
+        columns += [hist.percentile(float(q)) for q in percentiles]
+        return np.column_stack(columns)
+
+    # first and last year of the observations applied so far
+    def years(self):
+        return civilDates([self.first_ordinal,self.last_ordinal])[0]
+
+# dates (MM/DD) and table (float64, one column per STATS_FILE_COLUMNS after the date, followed by the
+# STATS_FILE_CI_COLUMNS if intervals are given) of the daily stats file for the dates with data, from groupedStats
+# style tables of the highs and lows with the lower and upper percentiles. intervals are the bootstrapIntervals of
+# the median, lower and upper percentiles of the highs and lows.
+def statsTable(high_stats,low_stats,valid,intervals=None):
+    rows = np.flatnonzero(valid)
+    table = np.hstack([high_stats[:,STATS_FILE_ORDER],low_stats[:,STATS_FILE_ORDER]])
+    if intervals is not None:
+        table = np.hstack([table] + [interval.reshape(len(interval),-1) for interval in intervals])
+    return np.array(CALENDAR_DATES)[rows],table[rows]
+
+# rows of the daily stats file layout (see statsTable)
+def statsRows(high_stats,low_stats,valid,intervals=None):
+    dates,table = statsTable(high_stats,low_stats,valid,intervals)
+    return [[date] + row for date,row in zip(dates.tolist(),table.tolist())]
+
+# write the daily stats as an uncompressed .npz file with the arrays date (<U5), stats (float64 dates x columns),
+# columns (names of the stats columns) and schema (JSON text: schema version, columns, dtype, units and any
+# metadata such as the station and period of record)
+def saveStats(path,dates,table,metadata=None):
+    columns = list(STATS_FILE_COLUMNS[1:]) + list(STATS_FILE_CI_COLUMNS[:table.shape[1] - len(STATS_FILE_COLUMNS) + 1])
+    schema = {'version':STATS_SCHEMA_VERSION,'date':"calendar date (MM/DD)",'columns':columns,'dtype':"float64",\
+        'units':"degrees Fahrenheit",'metadata':metadata or {}}
+    temp = "%s.%i.tmp.npz" % (os.path.splitext(path)[0],os.getpid())
+    np.savez(temp,date=np.asarray(dates,dtype="<U5"),stats=np.ascontiguousarray(table,dtype=np.float64),\
+        columns=np.array(columns),schema=np.array(json.dumps(schema)))
+    os.rename(temp,path)
+
+# read a binary stats file written by saveStats (or a daily stats CSV file); returns (dates,table,schema). The
+# stats table of a binary file is memory-mapped straight out of the (uncompressed) archive unless mmap is False.
+def loadStats(path,mmap=True):
+    if not path.endswith(".npz"):
+        import pandas
+        df = pandas.read_csv(path,header=None,dtype={0:str},float_precision="round_trip")
+        table = df.values[:,1:].astype(float)
+        columns = list(STATS_FILE_COLUMNS[1:]) + list(STATS_FILE_CI_COLUMNS[:table.shape[1] - len(STATS_FILE_COLUMNS) + 1])
+        return df[0].values.astype("<U5"),table,{'version':STATS_SCHEMA_VERSION,'columns':columns,'metadata':{}}
+
+    with np.load(path) as archive:
+        dates = archive['date']
+        schema = json.loads(str(archive['schema']))
+        table = None if mmap else archive['stats']
+    if table is None:
+        table = _memmapMember(path,"stats.npy")
+    if schema.get('version') != STATS_SCHEMA_VERSION:
+        raise ValueError("unsupported stats file schema version: %s" % schema.get('version'))
+    return dates,table,schema
+
+# memory-map an array stored (not compressed) in a .npz archive
+def _memmapMember(path,name):
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        with np.load(path) as archive:
+            return archive[name[:-4]]
+    with open(path,"rb") as f:
+        # local file header: 30 bytes, then the file name and extra field
+        f.seek(info.header_offset)
+        name_length,extra_length = struct.unpack("<HH",f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(f)
+        if version == (1,0):
+            shape,fortran_order,dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape,fortran_order,dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(path,dtype=dtype,mode="r",offset=offset,shape=shape,order="F" if fortran_order else "C")
+
+# per year, per calendar date whole-degree histograms stored as prefix sums over the years, so the histograms of
+# any range of years are the difference of two slices (the cost of a window does not depend on its length)
+class YearlyHistograms(object):
+    def __init__(self,ordinals,rows,values,temp_range=TEMP_RANGE):
+        years = civilDates(ordinals)[0]
+        values = np.asarray(values,dtype=float)
+        present = ~np.isnan(values)
+        years,rows,values = years[present],np.asarray(rows,dtype=np.int64)[present],values[present]
+        temps = np.rint(values).astype(np.int64)
+        if np.any(temps != values):
+            raise ValueError("YearlyHistograms requires whole-degree temperatures")
+
+        self.first_year = int(years.min())
+        self.last_year = int(years.max())
+        self.tmin = min(temp_range[0],int(temps.min()))
+        nbins = max(temp_range[1],int(temps.max())) - self.tmin + 1
+        nyears = self.last_year - self.first_year + 1
+        ngroups = len(CALENDAR_DATES)
+
+        # counts[year,row,bin] with one bincount, then accumulated over the years (with a leading zero year)
+        index = ((years - self.first_year) * ngroups + rows) * nbins + (temps - self.tmin)
+        counts = np.bincount(index,minlength=nyears * ngroups * nbins).reshape(nyears,ngroups,nbins)
+        self.cumulative = np.zeros((nyears + 1,ngroups,nbins),dtype=np.int32)
+        np.cumsum(counts,axis=0,out=self.cumulative[1:])
+
+    # DateHistograms of the observations from start_year through end_year (inclusive)
+    def window(self,start_year,end_year):
+        start = min(max(start_year - self.first_year,0),len(self.cumulative) - 1)
+        end = min(max(end_year - self.first_year + 1,0),len(self.cumulative) - 1)
+        return DateHistograms(self.cumulative[end] - self.cumulative[start],self.tmin)
+
+# compact station record for holding many stations in one process: int32 day ordinals, int16 calendar date rows,
+# int16 whole-degree temperatures (TEMP_MISSING when missing) and int16 precipitation in hundredths of an inch
+# (PRECIP_TRACE, PRECIP_MISSING). The rows are grouped by calendar date (chronological within a date), so the
+# observations of one date are a slice and every per date accessor returns a view, not a copy.
+class StationRecord(object):
+    __slots__ = ("station_id","name","source","ordinal","doy","high","low","precip","offsets")
+
+    def __init__(self,ordinals,rows,highs,lows,precip,station_id=None,name=None,source=None):
+        self.station_id = station_id
+        self.name = name or station_id
+        self.source = source
+        self.offsets,(self.ordinal,self.doy,self.high,self.low,self.precip) = groupByKey(rows,\
+            [np.asarray(ordinals,dtype=np.int32),np.asarray(rows,dtype=np.int16),encodeTemps(highs),\
+            encodeTemps(lows),encodePrecip(precip)])
+
+    # record of a station CSV file (see loadStation)
+    @classmethod
+    def fromFile(cls,climo_file,station_id=None,name=None):
+        data = loadStation(climo_file)
+        if station_id is None:
+            station_id = os.path.splitext(os.path.basename(climo_file))[0]
+        return cls(data['ordinal'],data['doy'],data['high'],data['low'],data['precip'],station_id,name,climo_file)
+
+    def __len__(self):
+        return len(self.ordinal)
+
+    # bytes held by the arrays of the record
+    @property
+    def nbytes(self):
+        return sum(getattr(self,name).nbytes for name in ("ordinal","doy","high","low","precip","offsets"))
+
+    # slice of the rows observed on a calendar date (MM/DD or a row of CALENDAR_DATES)
+    def dateSlice(self,date):
+        x = DATE_INDEX[date] if isinstance(date,str) else int(date)
+        return slice(self.offsets[x],self.offsets[x+1])
+
+    # encoded highs, lows or precipitation of a calendar date (views, not copies)
+    def dateHighs(self,date):
+        return self.high[self.dateSlice(date)]
+
+    def dateLows(self,date):
+        return self.low[self.dateSlice(date)]
+
+    def datePrecip(self,date):
+        return self.precip[self.dateSlice(date)]
+
+    # decoded temperatures (float, NaN when missing) of "high" or "low"
+    def temperatures(self,name):
+        return decodeTemps(getattr(self,name))
+
+    # decoded precipitation (float, TRACE for trace amounts, NaN when missing)
+    def precipitation(self):
+        return decodePrecip(self.precip)
+
+    # calendar date stats of the record (see CalendarStats; days with a missing high or low are left out, as in
+    # StationCube.calendarStats)
+    def calendarStats(self,percentiles=()):
+        highs = self.temperatures("high")
+        lows = self.temperatures("low")
+        present = ~np.isnan(highs) & ~np.isnan(lows)
+        return CalendarStats(self.doy[present],highs[present],lows[present],percentiles)
+
+# encode temperatures as int16 whole degrees with TEMP_MISSING for missing values
+def encodeTemps(values):
+    values = np.asarray(values)
+    if values.dtype == np.int16:
+        return values
+    values = values.astype(float)
+    missing = np.isnan(values)
+    encoded = np.rint(np.where(missing,0.0,values))
+    if np.any(encoded != np.where(missing,0.0,values)):
+        raise ValueError("StationRecord requires whole-degree temperatures")
+    encoded = encoded.astype(np.int16)
+    encoded[missing] = TEMP_MISSING
+    return encoded
+
+def decodeTemps(encoded):
+    encoded = np.asarray(encoded)
+    return np.where(encoded == TEMP_MISSING,np.nan,encoded.astype(float))
+
+# encode precipitation (as returned by parsePrecip) as int16 hundredths of an inch with PRECIP_TRACE and
+# PRECIP_MISSING
+def encodePrecip(values):
+    values = np.asarray(values)
+    if values.dtype == np.int16:
+        return values
+    values = values.astype(float)
+    missing = np.isnan(values)
+    encoded = np.rint(np.where(missing,0.0,values) * 100.0).astype(np.int16)
+    encoded[values == TRACE] = PRECIP_TRACE
+    encoded[missing] = PRECIP_MISSING
+    return encoded
+
+def decodePrecip(encoded):
+    encoded = np.asarray(encoded)
+    values = encoded / 100.0
+    values[encoded == PRECIP_TRACE] = TRACE
+    values[encoded == PRECIP_MISSING] = np.nan
+    return values
+
+# decode StationRecord/StationCube values of a variable ("high", "low" or "precip")
+def decodeValues(variable,encoded):
+    return decodePrecip(encoded) if variable == "precip" else decodeTemps(encoded)
+
+# write the records of many stations (StationRecord) into a cube directory (see StationCube)
+def buildCube(cube_dir,records):
+    if not os.path.isdir(cube_dir):
+        os.makedirs(cube_dir)
+    first_year = min(int(civilDates(record.ordinal.min())[0]) for record in records)
+    last_year = max(int(civilDates(record.ordinal.max())[0]) for record in records)
+    shape = (len(CALENDAR_DATES),len(records),last_year - first_year + 1,len(CUBE_VARIABLES))
+
+    # dates without an observation (including leap day in other years) are missing
+    temp = os.path.join(cube_dir,"%s.%i.tmp.npy" % (CUBE_FILE[:-4],os.getpid()))
+    cube = np.lib.format.open_memmap(temp,mode="w+",dtype=np.int16,shape=shape)
+    for v,variable in enumerate(CUBE_VARIABLES):
+        cube[...,v] = PRECIP_MISSING if variable == "precip" else TEMP_MISSING
+    for s,record in enumerate(records):
+        years = civilDates(record.ordinal)[0] - first_year
+        for v,variable in enumerate(CUBE_VARIABLES):
+            cube[record.doy,s,years,v] = getattr(record,variable)
+    cube.flush()
+    del cube
+    os.rename(temp,os.path.join(cube_dir,CUBE_FILE))
+
+    stations = [{'id':record.station_id,'name':record.name,'source':record.source} for record in records]
+    writeJSON(os.path.join(cube_dir,CUBE_INDEX),{'stations':stations,'first_year':first_year,\
+        'last_year':last_year,'variables':list(CUBE_VARIABLES),'layout':CUBE_LAYOUT})
+
+# memory-mapped multi-station store laid out as calendar date x station x year x variable (int16, encoded as in
+# StationRecord). One calendar date of all stations and years is a contiguous block of the file, so a one-date query
+# is a zero-copy view that reads only that block's pages (1/366 of the file).
+class StationCube(object):
+    __slots__ = ("cube_dir","cube","stations","station_index","first_year","last_year")
+
+    def __init__(self,cube_dir):
+        with open(os.path.join(cube_dir,CUBE_INDEX),"r") as f:
+            index = json.load(f)
+        if index.get('layout') != CUBE_LAYOUT:
+            raise ValueError("%s has an old cube layout, rebuild it" % cube_dir)
+        self.cube_dir = cube_dir
+        self.cube = np.load(os.path.join(cube_dir,CUBE_FILE),mmap_mode="r")
+        self.stations = index['stations']
+        self.station_index = dict((station['id'],s) for s,station in enumerate(self.stations))
+        self.first_year = index['first_year']
+        self.last_year = index['last_year']
+
+    @property
+    def years(self):
+        return np.arange(self.first_year,self.last_year + 1)
+
+    # encoded values of a variable as a view: stations x years x dates, or stations x years for one calendar date
+    # (MM/DD or a row of CALENDAR_DATES)
+    def view(self,variable,date=None):
+        values = self.cube[...,CUBE_VARIABLES.index(variable)]
+        if date is None:
+            return np.moveaxis(values,0,-1)
+        return values[DATE_INDEX[date] if isinstance(date,str) else int(date)]
+
+    # stats of every station (one row per station, columns as groupedStats) for a calendar date
+    def dateStats(self,date,variable="high",percentiles=()):
+        values = decodeValues(variable,self.view(variable,date))
+        present = ~np.isnan(values)
+        stations = np.nonzero(present)[0]
+        offsets,(values,) = groupByKey(stations,[values[present]],ngroups=len(self.stations))
+        return groupedStats(offsets,values,percentiles)
+
+    # calendar date stats of one station (see CalendarStats)
+    def calendarStats(self,station_id,percentiles=()):
+        s = self.station_index[station_id]
+        highs = decodeTemps(self.cube[:,s,:,CUBE_VARIABLES.index("high")])
+        lows = decodeTemps(self.cube[:,s,:,CUBE_VARIABLES.index("low")])
+        present = ~np.isnan(highs) & ~np.isnan(lows)
+        rows = np.broadcast_to(np.arange(len(CALENDAR_DATES))[:,None],highs.shape)
+        return CalendarStats(rows[present],highs[present],lows[present],percentiles)
+
+# design matrix of n equally spaced days: a constant plus order annual harmonics (cos/sin pairs with a period of
+# n days, so the fit wraps from the last day to the first) or a polynomial of degree order
+def smoothingDesign(n,method="harmonic",order=3):
+    if method == "harmonic":
+        angles = 2.0 * np.pi * np.outer(np.arange(n),np.arange(1,order + 1)) / n
+        return np.hstack([np.ones((n,1)),np.cos(angles),np.sin(angles)])
+    elif method == "polynomial":
+        # days scaled to [-1,1] keep the high degree columns well conditioned
+        return np.vander(np.linspace(-1.0,1.0,n),order + 1)
+    raise ValueError("unknown smoothing method: %s" % method)
+
+# least-squares smoothing of many daily series at once. series holds the days along the last axis (i.e. 8 x 365
+# for one station or stations x 8 x 365 for many); every series is fitted by one solve against the cached design
+# matrix of (n,method,order): the cached least-squares solution for the unit series turns the fit of every series
+# into two thin matrix products. Series must not contain missing values.
+@profiling.profiled("fit",rows_arg=0)
+def smoothSeries(series,method="harmonic",order=3):
+    series = np.asarray(series,dtype=float)
+    n = series.shape[-1]
+    key = (n,method,int(order))
+    if key not in _smoothing_cache:
+        design = smoothingDesign(n,method,int(order))
+        _smoothing_cache[key] = (design,np.linalg.lstsq(design,np.eye(n),rcond=None)[0])
+    design,solution = _smoothing_cache[key]
+    return series.reshape(-1,n).dot(solution.T).dot(design.T).reshape(series.shape)
+
+# bootstrap replicates of percentiles of groups (offsets and values from groupByKey) for the given groups and seeds
+# (numpy.random.SeedSequence, one per group). Every group is resampled with one replicates x n index matrix. Since
+# the values of the group are sorted first, sorting the (small integer) indexes of each replicate sorts its values,
+# so every order statistic of all replicates is a single column of the index matrix.
+def _bootstrapGroups(offsets,values,groups,seeds,percentiles,replicates,confidence):
+    bounds = [50.0 * (1.0 - confidence),50.0 * (1.0 + confidence)]
+    intervals = np.full((len(groups),len(percentiles),2),np.nan)
+    for i,(group,seed) in enumerate(zip(groups,seeds)):
+        ordered = np.sort(values[offsets[group]:offsets[group+1]])
+        n = len(ordered)
+        if n == 0:
+            continue
+        dtype = np.int16 if n <= np.iinfo(np.int16).max else np.int64
+        indexes = np.sort(np.random.default_rng(seed).integers(0,n,size=(replicates,n),dtype=dtype),axis=1)
+        for j,q in enumerate(percentiles):
+            # linear interpolation between order statistics, as in groupedStats
+            position = (q / 100.0) * (n - 1)
+            lower = int(np.floor(position))
+            below = ordered[indexes[:,lower]]
+            above = ordered[indexes[:,min(lower + 1,n - 1)]]
+            intervals[i,j] = np.percentile(below + (above - below) * (position - lower),bounds)
+    return intervals
+
+# bootstrap confidence intervals of percentiles (i.e. the median and the lower/upper percentiles) of every group.
+# Returns an array of ngroups x percentiles x 2 (lower and upper bounds of the confidence interval; NaN for empty
+# groups). Every group has its own seed spawned from seed, so the results do not depend on the number of worker
+# processes (workers=None uses all CPUs, workers=1 runs in this process).
+def bootstrapIntervals(offsets,values,percentiles=(50.0,),replicates=10000,confidence=0.9,seed=0,workers=None,\
+    chunk_groups=16):
+    offsets = np.asarray(offsets)
+    values = np.asarray(values,dtype=float)
+    percentiles = [float(q) for q in percentiles]
+    ngroups = len(offsets) - 1
+    seeds = np.random.SeedSequence(seed).spawn(ngroups)
+    chunks = [list(range(start,min(start + chunk_groups,ngroups))) for start in range(0,ngroups,chunk_groups)]
+
+    with profiling.stage("bootstrap",len(values)):
+        if workers == 1 or len(chunks) <= 1:
+            results = [_bootstrapGroups(offsets,values,groups,[seeds[g] for g in groups],percentiles,replicates,\
+                confidence) for groups in chunks]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = []
+                for groups in chunks:
+                    # each task only receives the values of its own groups
+                    start,end = offsets[groups[0]],offsets[groups[-1] + 1]
+                    futures.append(pool.submit(_bootstrapGroups,offsets[groups[0]:groups[-1] + 2] - start,\
+                        values[start:end],[g - groups[0] for g in groups],[seeds[g] for g in groups],percentiles,\
+                        replicates,confidence))
+                results = [future.result() for future in futures]
+    return np.concatenate(results) if results else np.full((0,len(percentiles),2),np.nan)
+
+# runs of consecutive days (ordinals one day apart) on which mask is true. Returns the index of the first day of
+# every run, the run lengths and (if values are given) the max or min value of every run. Missing days break runs.
+@profiling.profiled("events",rows_arg=0)
+def findStreaks(ordinals,mask,values=None,peak="max"):
+    ordinals = np.asarray(ordinals,dtype=np.int64)
+    mask = np.asarray(mask,dtype=bool)
+    continues = np.zeros(len(mask),dtype=bool)
+    continues[1:] = mask[1:] & mask[:-1] & (np.diff(ordinals) == 1)
+    starts = np.flatnonzero(mask & ~continues)
+    lengths = np.diff(np.append(np.cumsum(mask)[starts] - 1,np.count_nonzero(mask)))
+    if values is None or len(starts) == 0:
+        return starts,lengths,np.full(len(starts),np.nan)
+    reduce = np.maximum if peak == "max" else np.minimum
+    peaks = reduce.reduceat(np.asarray(values,dtype=float)[mask],np.cumsum(lengths) - lengths)
+    return starts,lengths,peaks
+
+# streaks of an event in a chronological record with per year and per calendar date indexes. Streaks are
+# attributed to the year they start in.
+class EventIndex(object):
+    def __init__(self,ordinals,rows,mask,observed,values=None,peak="max"):
+        ordinals = np.asarray(ordinals,dtype=np.int64)
+        rows = np.asarray(rows,dtype=np.int64)
+        starts,self.lengths,self.peaks = findStreaks(ordinals,mask,values,peak)
+        self.start_ordinals = ordinals[starts]
+        self.end_ordinals = self.start_ordinals + self.lengths - 1
+
+        # per year: streaks (offsets into the streak arrays), longest streak and number of event days
+        years = civilDates(ordinals)[0]
+        self.first_year,self.last_year = int(years.min()),int(years.max())
+        nyears = self.last_year - self.first_year + 1
+        start_years = civilDates(self.start_ordinals)[0] - self.first_year
+        self.year_offsets = np.concatenate(([0],np.cumsum(np.bincount(start_years,minlength=nyears))))
+        self.year_longest = np.zeros(nyears,dtype=np.int64)
+        np.maximum.at(self.year_longest,start_years,self.lengths)
+        self.year_days = np.bincount(years[mask] - self.first_year,minlength=nyears)
+
+        # per calendar date: number of event days and of observed days
+        self.date_days = np.bincount(rows[mask],minlength=len(CALENDAR_DATES))
+        self.date_observed = np.bincount(rows[observed],minlength=len(CALENDAR_DATES))
+
+    def __len__(self):
+        return len(self.lengths)
+
+    # indexes of the streaks that started in a year
+    def yearStreaks(self,year):
+        y = year - self.first_year
+        return np.arange(self.year_offsets[y],self.year_offsets[y+1])
+
+    def longest(self,year):
+        return int(self.year_longest[year - self.first_year])
+
+    # fraction of the observed years in which the event occurred on a calendar date (MM/DD)
+    def frequency(self,date):
+        x = DATE_INDEX[date]
+        return self.date_days[x] / float(self.date_observed[x]) if self.date_observed[x] else np.nan
+
+    # table of every streak (start and end dates as M/D/YYYY)
+    def streakTable(self):
+        import pandas
+        return pandas.DataFrame({'start':ordinalLabels(self.start_ordinals),'end':ordinalLabels(self.end_ordinals),\
+            'length':self.lengths,'peak':self.peaks})
+
+# M/D/YYYY labels of day ordinals (as in the Date column of the station files)
+def ordinalLabels(ordinals):
+    import pandas
+    years,months,days = civilDates(ordinals)
+    return pandas.Series(months).astype(str) + "/" + pandas.Series(days).astype(str) + "/" + pandas.Series(years).astype(str)
+
+# EventIndex of every event definition (see EVENTS) for a station loaded with loadStation, in one pass over the
+# chronological record
+def stationEvents(data,events=EVENTS):
+    order = np.argsort(data['ordinal'],kind="mergesort")
+    ordinals,rows = np.asarray(data['ordinal'])[order],np.asarray(data['doy'])[order]
+    indexes = {}
+    for name,(variable,comparison,threshold,peak) in events.items():
+        values = np.asarray(data[variable],dtype=float)[order]
+        observed = ~np.isnan(values)
+        with np.errstate(invalid="ignore"):
+            if comparison == ">=":
+                mask = values >= threshold
+            elif comparison == "<=":
+                mask = values <= threshold
+            else:
+                mask = values == threshold
+        indexes[name] = EventIndex(ordinals,rows,mask,observed,values if peak else None,peak)
+    return indexes
+
+# every record set on each calendar date over the period of record (the first observation of a date sets its first
+# record, later observations set a record when they beat it; ties do not). The running record is the cumulative
+# max (or min) over the years of the year x calendar date matrix, and the records are indexed by year and by date
+# so that the records of a year, the records per decade and the current record of a date are lookups.
+class RecordIndex(object):
+    def __init__(self,ordinals,rows,values,kind="max"):
+        years = civilDates(ordinals)[0]
+        values = np.asarray(values,dtype=float)
+        present = ~np.isnan(values)
+        years,rows,values = years[present],np.asarray(rows,dtype=np.int64)[present],values[present]
+        self.kind = kind
+        self.first_year,self.last_year = int(years.min()),int(years.max())
+        nyears,ndates = self.last_year - self.first_year + 1,len(CALENDAR_DATES)
+
+        # year x calendar date matrix (missing observations never set a record); min records are max records of -x
+        sign = 1.0 if kind == "max" else -1.0
+        matrix = np.full((nyears,ndates),-np.inf)
+        matrix[years - self.first_year,rows] = sign * values
+        running = np.maximum.accumulate(matrix,axis=0)
+        previous = np.vstack([np.full((1,ndates),-np.inf),running[:-1]])
+        self.running = sign * running
+
+        # record-setting observations in chronological order (year, then calendar date)
+        record_years,record_rows = np.nonzero(matrix > previous)
+        self.years = record_years + self.first_year
+        self.rows = record_rows
+        self.values = sign * matrix[record_years,record_rows]
+        self.previous = sign * previous[record_years,record_rows]      # +-inf for the first record of a date
+        self.year_offsets = np.concatenate(([0],np.cumsum(np.bincount(record_years,minlength=nyears))))
+
+        # current record and the year it was set for every calendar date
+        setting_year = np.where(matrix > previous,np.arange(nyears)[:,None],-1)
+        self.holder_years = np.maximum.accumulate(setting_year,axis=0)[-1] + self.first_year
+        self.holder_years[self.holder_years < self.first_year] = 0
+        self.holder_values = np.where(np.isinf(self.running[-1]),np.nan,self.running[-1])
+
+    def __len__(self):
+        return len(self.values)
+
+    # indexes of the records set in a year (broken_only skips the first record of each date)
+    def yearRecords(self,year,broken_only=True):
+        y = year - self.first_year
+        records = np.arange(self.year_offsets[y],self.year_offsets[y+1])
+        return records[~np.isinf(self.previous[records])] if broken_only else records
+
+    # number of records broken (not first set) in every decade; returns (decades,counts)
+    def decadeCounts(self):
+        broken = ~np.isinf(self.previous)
+        decades = self.years[broken] // 10 * 10
+        first = self.first_year // 10 * 10
+        counts = np.bincount((decades - first) // 10,minlength=(self.last_year // 10 * 10 - first) // 10 + 1)
+        return np.arange(first,self.last_year + 1,10)[:len(counts)],counts
+
+    # current record of a calendar date (MM/DD) and the year it was set
+    def holder(self,date):
+        x = DATE_INDEX[date]
+        return float(self.holder_values[x]),int(self.holder_years[x])
+
+    # running record of a calendar date at the end of a year
+    def recordAsOf(self,date,year):
+        value = self.running[min(year,self.last_year) - self.first_year,DATE_INDEX[date]]
+        return np.nan if np.isinf(value) else float(value)
+
+# RecordIndex of every record definition (see RECORDS) for a station loaded with loadStation
+def stationRecords(data,records=RECORDS):
+    return dict((name,RecordIndex(data['ordinal'],data['doy'],data[variable],kind))
+        for name,(variable,kind) in records.items())
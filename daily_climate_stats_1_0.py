@@ -6,25 +6,52 @@ temperatures for every day in a single station's climate history. The script wil
 statistics including median, standard deviation, percentile ranks, records, and means for each calendar
 date (i.e. all January 1sts, 2nds, etc.). The script will generate histograms of the high/low distributions
 for each date, then finally create plots showing each stat throughout the year. This script will also create
-a polynomial fit of each statistic to make a smoother plot (the degree of the polynomial can be determined
+a harmonic (or polynomial) fit of each statistic to make a smoother plot (the fit can be determined
 by the user (see the "USER SETTINGS SECTION" below for more details).
 
 Version history:
 1.0 (2017 June 22): Initial build.
+1.1 (2026 October 17): Reads the climate file once and computes the stats for all calendar dates in a single
+    vectorized pass (climate tools version 2.1). The climate file is cached in binary form (version 2.3) and
+    whole-degree data uses exact histogram stats (version 2.4).
+1.2 (2026 October 17): Split into functions (dailyStats, plotHistograms, writeStats, plotSummary and run) so that
+    batch_runner.py can run many stations, with output file locations as parameters.
+1.3 (2026 October 17): Added the incremental mode (see "incremental" below). The per date accumulators are kept in
+    state_file, only new observations are applied and only the histograms of the dates that changed are redrawn.
+    Delete state_file to rebuild it if older observations were edited.
+1.4 (2026 October 17): Histograms are rendered in parallel by histogram_render.py, which skips images whose data
+    did not change since the last run.
+1.5 (2026 October 17): The smoothed plot fits annual harmonics (wrapping from Dec 31 to Jan 1) to all eight series
+    with one batched least-squares solve (see "smoothing" below); the polynomial fit is still available.
+1.6 (2026 October 17): Stage timings, CPU time, peak memory and row counts are recorded with --profile FILE (or the
+    CLIMATE_PROFILE environment variable, see profiling.py).
+1.7 (2026 October 17): Optional bootstrap confidence intervals of the medians and lower/upper percentiles (see
+    "bootstrap" below), added to the stats file after the 15 usual columns.
+1.8 (2026 October 17): The plots are drawn from the stats in memory instead of re-reading annual_file, and the
+    stats are also written to a typed binary file with a schema (see "binary_stats" below).
+1.9 (2026 October 17): Counts streaks of 100 F highs, freezing lows and dry days (see "event_stats" below).
+1.10 (2026 October 17): Lists every record set or broken on each calendar date (see "record_stats" below).
+1.11 (2026 October 17): The stats and histograms of each date can pool a +-window_days window of dates.
+    The bootstrap resamples the pooled observations and the incremental mode pools the accumulated histograms.
+1.12 (2026 October 17): Importing the script no longer imports matplotlib or pandas (they are imported by the
+    plotting and event/record functions), and the command line is handled by main().
 '''
 
 # import modules
+import argparse
+import climate_tools_v2
 import csv
-import matplotlib.pyplot as plt
+import histogram_render
 import numpy as np
-from datetime import datetime
+import os
+import profiling
 
 __author__ = "Jason W. Godwin"
 __copyright__ = "Public Domain"
 __credits__ = ""
 
 __license__ = "GPL"
-__version__ = "1.0"
+__version__ = "1.12"
 __maintainer__ = "Jason W. Godwin"
 __email__ = "jasonwgodwin@gmail.com"
 __status__ = "Production"
@@ -32,301 +59,412 @@ __status__ = "Production"
 ### USER SETTINGS SECTION BEGIN ###
 climo_file = "dfw.csv"          # file path of CSV file containing climate data
 annual_file = "dfw_stats.csv"   # file path of output CSV file that will contain stats for each day
+binary_stats = True             # also write the stats to <annual_file without .csv>.npz (see climate_tools_v2.saveStats)
 station = "Dallas/Fort Worth"   # station name (i.e. "Dallas/Fort Worth", "DFW", "KDFW", etc.)
-skip_header = True              # Does your CSV file have a header line?
+image_dir = "images"            # directory for the daily histogram images
+plot_dir = "."                  # directory for the annual plots (temperatures.png, stdevs.png, polyfit.png)
 temp_intvl = 5                  # bin interval for histogram plots
+smoothing = "harmonic"          # smoothed plot fit: "harmonic" (annual harmonics) or "polynomial"
+harmonics = 3                   # number of annual harmonics of the harmonic fit
 polydegree = 5                  # degree of polynomial fit
 testmode = False                # set to True or False: enabled, this will stop the script after January
 lower_pct = 10                  # lower percentile to computer (whole percent: i.e. 25th Percentile is entered as "25")
 upper_pct = 90                  # upper percentile (as above)
+window_days = 0                 # pool the dates within +-window_days of each date (0: that date only; whole degrees)
+render_workers = None           # processes for drawing the histograms and the bootstrap (None: all CPUs, 1: no pool)
+incremental = False             # set to True to only apply observations added since the last incremental run
+state_file = "dfw_state.npz"    # file path of the accumulated stats used by the incremental mode
+event_stats = True              # write the streaks of climate_tools_v2.EVENTS to <annual_file without .csv>_events*.csv
+record_stats = True             # write every record set on each date to <annual_file without .csv>_records.csv
+bootstrap = False               # set to True to add bootstrap confidence intervals (not used by the incremental mode)
+bootstrap_replicates = 10000    # number of bootstrap resamples of each date
+bootstrap_confidence = 0.90     # confidence level of the intervals
+bootstrap_seed = 0              # random seed of the bootstrap (results do not depend on the number of processes)
 ### USER SETTINGS SECTION END (DO NOT EDIT BELOW THIS LINE UNLESS YOU REALLY KNOW WHAT YOU ARE DOING!) ###
 
-# declare a bunch of lists
-dates = []
-high_medians = []   # median high temperatures for each date
-high_stdevs = []    # standard deviation of high temperatures
-high_lowers = []    # lower percentile rank for high temperatures
-high_uppers = []    # upper percentile rank for high temperatures
-high_means = []     # mean high temperatures
-low_medians = []    # median low temperatures
-low_stdevs = []     # standard deviation of low temperatures
-low_lowers = []     # lower percentile rank for low temperatures
-low_uppers = []     # upper percentile rank for low temperatures
-low_means = []      # mean low temperatures
-high_max = []       # record maximum high temperatures
-high_min = []       # record minimum high temperatures (i.e. lowest max temp for a day)
-low_max = []        # record maximum low temperatures (i.e. highest min temp for a day)
-low_min = []        # record minimum low temperatures
-actualdate = []     # actual date of record (i.e. M/D/Y)
-
-# loop structure for going through every valid calendar date
-for month in range(1,13):
+# compute the stats for every calendar date of a station (columns of each stats table: median,stdev,mean,max,min,
+# lower,upper)
+def dailyStats(climo_file,lower_pct=lower_pct,upper_pct=upper_pct,testmode=testmode,window=window_days):
+    # import the climate data (parsed once, then loaded from the binary cache on later runs)
+    data = climate_tools_v2.loadStation(climo_file)
+    years = climate_tools_v2.civilDates(data['ordinal'])[0]
+    first_year,last_year = years.min(),years.max()
+    date_rows = np.asarray(data['doy'])
+    all_highs = np.asarray(data['high'],dtype=float)
+    all_lows = np.asarray(data['low'],dtype=float)
+
     # interupt after January if in test mode
-    if month == 2 and testmode:
-        break
-
-    # get correct number of days for each month
-    if month in [1,3,5,7,8,10,12]:
-        days = 32
-    elif month in [4,6,9,11]:
-        days = 31
-    elif month == 2:
-        days = 30
-    else:
-        raise Exception("Invalid month!")
-
-    # loop through every valid date within each month
-    for day in range(1,days):
-        if len(str(month)) < 2:
-            month = "0" + str(month)
-        if len(str(day)) < 2:
-            day = "0" + str(day)
-
-        user_date = str(month) + "/" + str(day)
-        print user_date
-
-        # variables that will be reset for each calendar date
-        highs = []  # daily high temperatures
-        lows = []   # daily low temperatures
-        precip = [] # precipitation accumulation (unused at the moment)
-
-        # open the CSV file
-        reader = csv.reader(open(climo_file,"r"))
-
-        # import data from the CSV file
-        for row in reader:
-            if skip_header:
-                skip_header = False
-                continue
-            date = row[1]
-            if date == user_date:
-                actualdate.append(datetime.strptime(row[0],"%m/%d/%Y"))
-                highs.append(float(row[2]))
-                lows.append(float(row[3]))
-                precip.append(float(row[4]))
-
-        # compute stats
-        fields = [highs,lows]
-        labels = ["High","Low"]
-
-        for i in range(len(fields)):
-            # calculate stats
-            median = np.median(fields[i])               # median temperature
-            stdev = np.std(fields[i])                   # standard deviation of temperatures
-            lower = np.percentile(fields[i],lower_pct)  # lower percentile rank for temperatures
-            upper = np.percentile(fields[i],upper_pct)  # upper percentile rank for temperatures
-            mean = np.mean(fields[i])                   # mean temperature
-            recordmax = np.max(fields[i])               # record maximum high/low temperature
-            recordmin = np.min(fields[i])               # record minimum high/low temperature
-
-            # sort the stats into the right category
-            if labels[i] == "High":
-                dates.append(user_date)
-                high_medians.append(median)
-                high_stdevs.append(stdev)
-                high_lowers.append(lower)
-                high_uppers.append(upper)
-                high_means.append(mean)
-                high_max.append(recordmax)
-                high_min.append(recordmin)
-            else:
-                low_medians.append(median)
-                low_stdevs.append(stdev)
-                low_lowers.append(lower)
-                low_uppers.append(upper)
-                low_means.append(mean)
-                low_max.append(recordmax)
-                low_min.append(recordmin)
-                
+    if testmode:
+        january = date_rows < 31
+        date_rows,all_highs,all_lows = date_rows[january],all_highs[january],all_lows[january]
+
+    # group the observations by calendar date into contiguous blocks
+    offsets,(all_highs,all_lows) = climate_tools_v2.groupByKey(date_rows,[all_highs,all_lows])
+
+    # compute the stats for every calendar date at once (columns: median,stdev,mean,max,min,lower,upper)
+    fields = [all_highs,all_lows]
+    labels = ["High","Low"]
+    valid = np.diff(offsets) > 0
+    histograms = None
+    try:
+        # whole-degree data: exact stats from per-date histograms (pooled over the window of dates)
+        rows = np.repeat(np.arange(len(valid)),np.diff(offsets))
+        histograms = [climate_tools_v2.DateHistograms.fromValues(rows,field).window(window) for field in fields]
+        stats = [hist.stats([lower_pct,upper_pct]) for hist in histograms]
+    except ValueError:
+        if window:
+            raise
+        stats = [climate_tools_v2.groupedStats(offsets,field,[lower_pct,upper_pct]) for field in fields]
+
+    result = {'offsets':offsets,'valid':valid,'fields':fields,'labels':labels,'stats':stats,\
+        'first_year':first_year,'last_year':last_year,'window':window}
+    if window:
+        # the histogram images show the pooled distributions
+        result['histograms'] = histograms
+        result['valid'] = histograms[0].n > 0
+    return result
+
+# bootstrap confidence intervals of the median and lower/upper percentiles of the highs and lows of every date
+# (added to the result as 'intervals', see climate_tools_v2.bootstrapIntervals). With a window, the observations of
+# the dates within +-window days are resampled together, as they are pooled in the stats.
+def bootstrapStats(result,lower_pct=lower_pct,upper_pct=upper_pct,replicates=bootstrap_replicates,\
+    confidence=bootstrap_confidence,seed=bootstrap_seed,workers=None):
+    groups = [(result['offsets'],field) for field in result['fields']]
+    if result.get('window'):
+        groups = [climate_tools_v2.circularWindowGroups(offsets,field,result['window']) for offsets,field in groups]
+    result['intervals'] = [climate_tools_v2.bootstrapIntervals(offsets,field,[50.0,lower_pct,upper_pct],\
+        replicates,confidence,seed + i,workers) for i,(offsets,field) in enumerate(groups)]
+    return result
+
+# plot the histograms for each valid calendar date (images whose data did not change since the last run are skipped)
+def plotHistograms(result,image_dir=image_dir,temp_intvl=temp_intvl,verbose=True,rows=None,workers=render_workers):
+    labels,stats = result['labels'],result['stats']
+    first_year,last_year = result['first_year'],result['last_year']
+
+    # only the given rows of CALENDAR_DATES (default: every date with data)
+    if rows is None:
+        rows = np.flatnonzero(result['valid'])
+
+    jobs = []
+    for x in rows:
+        user_date = climate_tools_v2.CALENDAR_DATES[x]
+
+        for i in range(len(labels)):
+            median,stdev,mean,recordmax,recordmin,lower,upper = stats[i][x]
+
             # setup the bins for the histogram
-            if np.min(fields[i]) % temp_intvl != 0:
-                binmin = temp_intvl * round(np.min(fields[i]) / temp_intvl) - temp_intvl
+            if recordmin % temp_intvl != 0:
+                binmin = temp_intvl * round(recordmin / temp_intvl) - temp_intvl
             else:
-                binmin = np.min(fields[i]) + temp_intvl
+                binmin = recordmin + temp_intvl
 
-            if np.max(fields[i]) % temp_intvl != 0:
-                binmax = temp_intvl * round(np.max(fields[i]) / temp_intvl) + temp_intvl
+            if recordmax % temp_intvl != 0:
+                binmax = temp_intvl * round(recordmax / temp_intvl) + temp_intvl
             else:
-                binmax = np.max(fields[i]) + temp_intvl
+                binmax = recordmax + temp_intvl
 
             bins = np.arange(binmin,binmax+1,temp_intvl)
 
-            # plot the histogram
-            plt.hist(fields[i],bins,histtype="bar",color="gray")
-            plt.axvline(x=median,color="red")
-            plt.title("Median: %.0f | 10th Percentile: %.0f | 90th Percentile: %.0f | Standard Deviation: %.1f" % (median,lower,upper,stdev),size="x-small")
-            plt.axvline(x=upper,color="red",linestyle="--")
-            plt.axvline(x=lower,color="red",linestyle="--")
-            plt.yticks(np.arange(0,41,5))
-            plt.xticks(np.arange(-5,115,5),rotation=90,size="x-small")
-            plt.grid()
-            plt.suptitle("%s Temperature Distribution for %s (period of record: %i-%i)" % (labels[i],user_date,min(actualdate).year,max(actualdate).year))
-            filename = "images/" + labels[i] + user_date.replace("/","_") + ".png"
-            plt.savefig(filename,bbox_inches="tight")
-            plt.clf()
-
-# create an output CSV file for the statistics for later use
-with open(annual_file,"wb") as csvfile:
-    statwriter = csv.writer(csvfile,delimiter=",")
-    for x in range(len(dates)):
-        stuff = [dates[x],high_medians[x],high_means[x],high_stdevs[x],high_lowers[x],high_uppers[x],high_max[x],high_min[x],low_medians[x],low_means[x],low_stdevs[x],low_lowers[x],low_uppers[x],low_max[x],low_min[x]]
-        statwriter.writerow(stuff)
-
-# read in the annual stats file
-reader = csv.reader(open(annual_file,"r"))
-
-# initiate "clean" variables to be read in (same definitions as above)
-dates = []
-median_highs = []
-mean_highs = []
-stdev_highs = []
-lower_highs = []
-upper_highs = []
-max_highs = []
-min_highs = []
-median_lows = []
-mean_lows = []
-stdev_lows = []
-lower_lows = []
-upper_lows = []
-max_lows = []
-min_lows = []
-
-# read in the file for each data
-for row in reader:
+            # bar heights of the histogram
+            if 'histograms' in result:
+                hist = result['histograms'][i]
+                heights = np.histogram(hist.temps,bins,weights=hist.counts[x])[0]
+            else:
+                heights = np.histogram(result['fields'][i][result['offsets'][x]:result['offsets'][x+1]],bins)[0]
+
+            # pooled histograms are taller, so their y ticks are spaced to the tallest bar
+            yticks = histogram_render.YTICKS
+            if result.get('window'):
+                step = 5 * int(np.ceil(max(heights.max(),1) / 40.0))
+                yticks = np.arange(0,heights.max() + step,step)
+
+            jobs.append(histogram_render.HistogramJob(
+                os.path.join(image_dir,labels[i] + user_date.replace("/","_") + ".png"),bins,heights,median,lower,upper,stdev,
+                "Median: %.0f | 10th Percentile: %.0f | 90th Percentile: %.0f | Standard Deviation: %.1f" % (median,lower,upper,stdev),
+                "%s Temperature Distribution for %s%s (period of record: %i-%i)" % (labels[i],user_date,\
+                " +-%i days" % result['window'] if result.get('window') else "",first_year,last_year),yticks))
+
+    rendered,skipped = histogram_render.renderHistograms(jobs,image_dir,workers)
+    if verbose:
+        print("Histograms: %i rendered, %i unchanged" % (rendered,skipped))
+
+# create an output CSV file for the statistics for later use (no header line, see
+# climate_tools_v2.STATS_FILE_COLUMNS) and, if binary, the same table as a typed .npz file with its schema
+def writeStats(result,annual_file,binary=binary_stats,station=station,lower_pct=lower_pct,upper_pct=upper_pct):
+    dates,table = climate_tools_v2.statsTable(result['stats'][0],result['stats'][1],result['valid'],\
+        result.get('intervals'))
+    with open(annual_file,"w") as csvfile:
+        statwriter = csv.writer(csvfile,delimiter=",")
+        statwriter.writerows([date] + row for date,row in zip(dates.tolist(),table.tolist()))
+    if binary:
+        climate_tools_v2.saveStats(os.path.splitext(annual_file)[0] + ".npz",dates,table,{'station':station,\
+            'first_year':int(result['first_year']),'last_year':int(result['last_year']),\
+            'lower_pct':lower_pct,'upper_pct':upper_pct})
+
+# find the heat wave, freeze and dry streaks of the whole record and write them with per year and per calendar date
+# summaries: <root>_events.csv (every streak), <root>_events_yearly.csv (number of streaks, longest streak and
+# event days per year) and <root>_events_dates.csv (fraction of years with the event on each calendar date)
+def writeEvents(climo_file,annual_file):
+    import pandas
+    events = climate_tools_v2.stationEvents(climate_tools_v2.loadStation(climo_file))
+    root = os.path.splitext(annual_file)[0]
+
+    tables = []
+    for name,index in events.items():
+        table = index.streakTable()
+        table.insert(0,'event',name)
+        tables.append(table)
+    pandas.concat(tables).to_csv(root + "_events.csv",index=False)
+
+    index = list(events.values())[0]
+    yearly = pandas.DataFrame({'year':np.arange(index.first_year,index.last_year + 1)})
+    dates = pandas.DataFrame({'date':climate_tools_v2.CALENDAR_DATES})
+    for name,index in events.items():
+        yearly[name + "_streaks"] = np.diff(index.year_offsets)
+        yearly[name + "_longest"] = index.year_longest
+        yearly[name + "_days"] = index.year_days
+        with np.errstate(invalid="ignore",divide="ignore"):
+            dates[name + "_frequency"] = index.date_days / index.date_observed
+    yearly.to_csv(root + "_events_yearly.csv",index=False)
+    dates.to_csv(root + "_events_dates.csv",index=False)
+    return events
+
+# write every record set or broken over the period of record (see climate_tools_v2.RECORDS) to <root>_records.csv
+# with the record it beat (empty for the first record of a date) and whether it is the current record
+def writeRecords(climo_file,annual_file):
+    import pandas
+    records = climate_tools_v2.stationRecords(climate_tools_v2.loadStation(climo_file))
+    tables = []
+    for name,index in records.items():
+        tables.append(pandas.DataFrame({'record':name,'date':np.array(climate_tools_v2.CALENDAR_DATES)[index.rows],\
+            'year':index.years,'value':index.values,'previous':np.where(np.isinf(index.previous),np.nan,index.previous),\
+            'current':index.years == index.holder_years[index.rows]}))
+    pandas.concat(tables).to_csv(os.path.splitext(annual_file)[0] + "_records.csv",index=False)
+    return records
+
+# plot the stats throughout the year from the result of dailyStats/accumulatorStats (or from a stats file)
+def plotSummary(stats,first_year,last_year,station=station,plot_dir=plot_dir,polydegree=polydegree,\
+    smoothing=smoothing,harmonics=harmonics):
+    import matplotlib.pyplot as plt
+    if not os.path.isdir(plot_dir):
+        os.makedirs(plot_dir)
+
+    # the stats come straight from the stats stage (or from a stats file written earlier)
+    if isinstance(stats,str):
+        dates,table,schema = climate_tools_v2.loadStats(stats)
+    else:
+        dates,table = climate_tools_v2.statsTable(stats['stats'][0],stats['stats'][1],stats['valid'])
     # skip leap days since the sample size will be small
-    if row[0] == "02/29":
-        continue
-    dates.append(row[0])
-    median_highs.append(float(row[1]))
-    mean_highs.append(float(row[2]))
-    stdev_highs.append(float(row[3]))
-    lower_highs.append(float(row[4]))
-    upper_highs.append(float(row[5]))
-    max_highs.append(float(row[6]))
-    min_highs.append(float(row[7]))
-    median_lows.append(float(row[8]))
-    mean_lows.append(float(row[9]))
-    stdev_lows.append(float(row[10]))
-    lower_lows.append(float(row[11]))
-    upper_lows.append(float(row[12]))
-    max_lows.append(float(row[13]))
-    min_lows.append(float(row[14]))
-
-# plotting routine for raw, unsmoothed data
-plt.clf()
-# figure setup
-fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
-ax = fig.add_subplot(1,1,1)
-major_ticks = np.arange(-10,121,10)
-minor_ticks = np.arange(-10,121,5)
-ax.set_xticks(np.arange(len(dates)))
-ax.set_yticks(major_ticks)
-ax.set_yticks(minor_ticks,minor=True)
-ax.grid(which="both")
-ax.grid(which="major",alpha=1.0)
-ax.grid(which="minor",alpha=0.2)
-dummies = np.arange(len(dates))
-# create shaded area for percentile range
-ax.fill_between(dummies,lower_highs,upper_highs,facecolor="red",interpolate=True,alpha=0.2)
-ax.fill_between(dummies,lower_lows,upper_lows,facecolor="blue",interpolate=True,alpha=0.2)
-# plot daily data
-plt.plot(dummies,median_highs,color="red",linestyle="",marker="o",label="Median High")      # daily median highs
-plt.plot(dummies,median_lows,color="blue",linestyle="",marker="o",label="Median Low")       # daily median lows
-plt.plot(dummies,max_highs,color="red",linestyle="-",linewidth=4.0,label="Record Highs")    # daily record highs
-plt.plot(dummies,min_lows,color="blue",linestyle="-",linewidth=4.0,label="Record Lows")     # daily record lows
-# plot aesthetics
-plt.xticks(dummies[::30],dates[::30],rotation=90)
-plt.xlim([0,364])
-plt.ylim([-10,120])
-plt.xlabel("Calendar Day")
-plt.ylabel("Temperature (degrees Fahrenheit)")
-plt.title("Temperature Climatology for Dallas/Fort Worth (period of record: %i - %i)" % (min(actualdate).year,max(actualdate).year))
-plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
-# freezing and 100 F lines
-plt.axhline(y=32,xmin=0,xmax=364,color="cyan")
-plt.text(182,32.5,"32 F")
-plt.axhline(y=100,xmin=0,xmax=364,color="magenta")
-plt.text(182,100.5,"100 F")
-# save the figure
-plt.savefig("temperatures.png",bbox_inches="tight")
-plt.clf()
-
-# plot the standard deviation throughout the year
-# figure setup
-fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
-ax = fig.add_subplot(1,1,1)
-major_ticks = np.arange(0,15.01,0.5)
-minor_ticks = np.arange(0,15.01,0.1)
-ax.set_xticks(np.arange(len(dates)))
-ax.set_yticks(major_ticks)
-ax.set_yticks(minor_ticks,minor=True)
-ax.grid(which="both")
-ax.grid(which="major",alpha=1.0)
-ax.grid(which="minor",alpha=0.2)
-dummies = np.arange(len(dates))
-# plot the daily standard deviations
-plt.plot(dummies,stdev_highs,color="red",linestyle="-",linewidth=4.0,label="Highs")
-plt.plot(dummies,stdev_lows,color="blue",linestyle="-",linewidth=4.0,label="Lows")
-# plot aesthetics
-plt.xticks(dummies[::30],dates[::30],rotation=90)
-plt.xlim([0,364])
-plt.ylim([0,15])
-plt.xlabel("Calendar Day")
-plt.ylabel("Standard Deviation (degrees Fahrenheit)")
-plt.title("Daily Temperature Standard Deviation for %s (period of record: %i - %i)" % (station,min(actualdate).year,max(actualdate).year))
-plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
-# save the figure
-plt.savefig("stdevs.png",bbox_inches="tight")
-plt.clf()
-
-# smoothed plots
-x = 0
-ys = []
-
-# get the polynomial fit for each dataset
-for var in [lower_highs,upper_highs,lower_lows,upper_lows,median_highs,median_lows,max_highs,min_lows]:
-    coefficients = np.polyfit(dummies,var,int(polydegree))
-    polynomial = np.poly1d(coefficients)
-    ys.append(polynomial(dummies))
-    x += 1
-
-plt.clf()
-# figure setup
-fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
-ax = fig.add_subplot(1,1,1)
-major_ticks = np.arange(-10,121,10)
-minor_ticks = np.arange(-10,121,5)
-ax.set_xticks(np.arange(len(dates)))
-ax.set_yticks(major_ticks)
-ax.set_yticks(minor_ticks,minor=True)
-ax.grid(which="both")
-ax.grid(which="major",alpha=1.0)
-ax.grid(which="minor",alpha=0.2)
-
-# create shaded area for percentile range
-ax.fill_between(dummies,ys[0],ys[1],facecolor="red",interpolate=True,alpha=0.2)
-ax.fill_between(dummies,ys[2],ys[3],facecolor="blue",interpolate=True,alpha=0.2)
-# plot daily data
-plt.plot(dummies,ys[4],color="red",linestyle="-",linewidth=2,label="Median High")       # daily median highs
-plt.plot(dummies,ys[5],color="blue",linestyle="-",linewidth=2,label="Median Low")       # daily median lows
-plt.plot(dummies,ys[6],color="red",linestyle="-",linewidth=4.0,label="Record Highs")    # daily record highs
-plt.plot(dummies,ys[7],color="blue",linestyle="-",linewidth=4.0,label="Record Lows")    # daily record lows
-# plot aesthetics
-plt.xticks(dummies[::30],dates[::30],rotation=90)
-plt.xlim([0,364])
-plt.ylim([-10,120])
-plt.xlabel("Calendar Day")
-plt.ylabel("Temperature (degrees Fahrenheit)")
-plt.title("Temperature Climatology for Dallas/Fort Worth (%sth degree polynomial fit, period of record: %i - %i)" % (polydegree,min(actualdate).year,max(actualdate).year))
-plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
-# freezing and 100 F lines
-plt.axhline(y=32,xmin=0,xmax=364,color="cyan")
-plt.text(182,32.5,"32 F")
-plt.axhline(y=100,xmin=0,xmax=364,color="magenta")
-plt.text(182,100.5,"100 F")
-# save the figure
-plt.savefig("polyfit.png",bbox_inches="tight")
-plt.clf()
-
-print("Done")
+    keep = dates != "02/29"
+    dates = dates[keep]
+    column = lambda name: table[keep,climate_tools_v2.STATS_FILE_COLUMNS.index(name) - 1]
+    median_highs,mean_highs,stdev_highs = column("high_median"),column("high_mean"),column("high_stdev")
+    lower_highs,upper_highs = column("high_lower"),column("high_upper")
+    max_highs,min_highs = column("high_max"),column("high_min")
+    median_lows,mean_lows,stdev_lows = column("low_median"),column("low_mean"),column("low_stdev")
+    lower_lows,upper_lows = column("low_lower"),column("low_upper")
+    max_lows,min_lows = column("low_max"),column("low_min")
+
+    # plotting routine for raw, unsmoothed data
+    plt.clf()
+    # figure setup
+    fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
+    ax = fig.add_subplot(1,1,1)
+    major_ticks = np.arange(-10,121,10)
+    minor_ticks = np.arange(-10,121,5)
+    ax.set_xticks(np.arange(len(dates)))
+    ax.set_yticks(major_ticks)
+    ax.set_yticks(minor_ticks,minor=True)
+    ax.grid(which="both")
+    ax.grid(which="major",alpha=1.0)
+    ax.grid(which="minor",alpha=0.2)
+    dummies = np.arange(len(dates))
+    # create shaded area for percentile range
+    ax.fill_between(dummies,lower_highs,upper_highs,facecolor="red",interpolate=True,alpha=0.2)
+    ax.fill_between(dummies,lower_lows,upper_lows,facecolor="blue",interpolate=True,alpha=0.2)
+    # plot daily data
+    plt.plot(dummies,median_highs,color="red",linestyle="",marker="o",label="Median High")      # daily median highs
+    plt.plot(dummies,median_lows,color="blue",linestyle="",marker="o",label="Median Low")       # daily median lows
+    plt.plot(dummies,max_highs,color="red",linestyle="-",linewidth=4.0,label="Record Highs")    # daily record highs
+    plt.plot(dummies,min_lows,color="blue",linestyle="-",linewidth=4.0,label="Record Lows")     # daily record lows
+    # plot aesthetics
+    plt.xticks(dummies[::30],dates[::30],rotation=90)
+    plt.xlim([0,364])
+    plt.ylim([-10,120])
+    plt.xlabel("Calendar Day")
+    plt.ylabel("Temperature (degrees Fahrenheit)")
+    plt.title("Temperature Climatology for %s (period of record: %i - %i)" % (station,first_year,last_year))
+    plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
+    # freezing and 100 F lines
+    plt.axhline(y=32,xmin=0,xmax=364,color="cyan")
+    plt.text(182,32.5,"32 F")
+    plt.axhline(y=100,xmin=0,xmax=364,color="magenta")
+    plt.text(182,100.5,"100 F")
+    # save the figure
+    plt.savefig(os.path.join(plot_dir,"temperatures.png"),bbox_inches="tight")
+    plt.clf()
+
+    # plot the standard deviation throughout the year
+    # figure setup
+    fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
+    ax = fig.add_subplot(1,1,1)
+    major_ticks = np.arange(0,15.01,0.5)
+    minor_ticks = np.arange(0,15.01,0.1)
+    ax.set_xticks(np.arange(len(dates)))
+    ax.set_yticks(major_ticks)
+    ax.set_yticks(minor_ticks,minor=True)
+    ax.grid(which="both")
+    ax.grid(which="major",alpha=1.0)
+    ax.grid(which="minor",alpha=0.2)
+    dummies = np.arange(len(dates))
+    # plot the daily standard deviations
+    plt.plot(dummies,stdev_highs,color="red",linestyle="-",linewidth=4.0,label="Highs")
+    plt.plot(dummies,stdev_lows,color="blue",linestyle="-",linewidth=4.0,label="Lows")
+    # plot aesthetics
+    plt.xticks(dummies[::30],dates[::30],rotation=90)
+    plt.xlim([0,364])
+    plt.ylim([0,15])
+    plt.xlabel("Calendar Day")
+    plt.ylabel("Standard Deviation (degrees Fahrenheit)")
+    plt.title("Daily Temperature Standard Deviation for %s (period of record: %i - %i)" % (station,first_year,last_year))
+    plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
+    # save the figure
+    plt.savefig(os.path.join(plot_dir,"stdevs.png"),bbox_inches="tight")
+    plt.clf()
+
+    # smoothed plots (all eight series are fitted with one solve)
+    order = harmonics if smoothing == "harmonic" else polydegree
+    ys = climate_tools_v2.smoothSeries([lower_highs,upper_highs,lower_lows,upper_lows,median_highs,median_lows,\
+        max_highs,min_lows],smoothing,order)
+    if smoothing == "harmonic":
+        fit_label = "%i annual harmonic fit" % int(harmonics)
+    else:
+        fit_label = "%sth degree polynomial fit" % polydegree
+
+    plt.clf()
+    # figure setup
+    fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
+    ax = fig.add_subplot(1,1,1)
+    major_ticks = np.arange(-10,121,10)
+    minor_ticks = np.arange(-10,121,5)
+    ax.set_xticks(np.arange(len(dates)))
+    ax.set_yticks(major_ticks)
+    ax.set_yticks(minor_ticks,minor=True)
+    ax.grid(which="both")
+    ax.grid(which="major",alpha=1.0)
+    ax.grid(which="minor",alpha=0.2)
+
+    # create shaded area for percentile range
+    ax.fill_between(dummies,ys[0],ys[1],facecolor="red",interpolate=True,alpha=0.2)
+    ax.fill_between(dummies,ys[2],ys[3],facecolor="blue",interpolate=True,alpha=0.2)
+    # plot daily data
+    plt.plot(dummies,ys[4],color="red",linestyle="-",linewidth=2,label="Median High")       # daily median highs
+    plt.plot(dummies,ys[5],color="blue",linestyle="-",linewidth=2,label="Median Low")       # daily median lows
+    plt.plot(dummies,ys[6],color="red",linestyle="-",linewidth=4.0,label="Record Highs")    # daily record highs
+    plt.plot(dummies,ys[7],color="blue",linestyle="-",linewidth=4.0,label="Record Lows")    # daily record lows
+    # plot aesthetics
+    plt.xticks(dummies[::30],dates[::30],rotation=90)
+    plt.xlim([0,364])
+    plt.ylim([-10,120])
+    plt.xlabel("Calendar Day")
+    plt.ylabel("Temperature (degrees Fahrenheit)")
+    plt.title("Temperature Climatology for %s (%s, period of record: %i - %i)" % (station,fit_label,first_year,last_year))
+    plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
+    # freezing and 100 F lines
+    plt.axhline(y=32,xmin=0,xmax=364,color="cyan")
+    plt.text(182,32.5,"32 F")
+    plt.axhline(y=100,xmin=0,xmax=364,color="magenta")
+    plt.text(182,100.5,"100 F")
+    # save the figure
+    plt.savefig(os.path.join(plot_dir,"polyfit.png"),bbox_inches="tight")
+    plt.clf()
+    plt.close("all")
+
+# stats of a ClimatologyAccumulator in the same form as dailyStats (histograms replace the grouped observations);
+# with a window, the histograms of the dates within +-window days are pooled as in dailyStats
+def accumulatorStats(accumulator,lower_pct=lower_pct,upper_pct=upper_pct,window=window_days):
+    first_year,last_year = accumulator.years()
+    names = climate_tools_v2.ClimatologyAccumulator.variables
+    if window:
+        histograms = [accumulator.histograms(name).window(window) for name in names]
+        stats = [hist.stats([lower_pct,upper_pct]) for hist in histograms]
+        valid = histograms[0].n > 0
+    else:
+        histograms = [accumulator.histograms(name) for name in names]
+        stats = [accumulator.stats(name,[lower_pct,upper_pct]) for name in names]
+        valid = accumulator.arrays['high_n'] > 0
+    return {'valid':valid,'labels':["High","Low"],'histograms':histograms,'stats':stats,\
+        'first_year':first_year,'last_year':last_year,'window':window}
+
+# apply only the observations added since the last run, then rewrite the stats file and summary plots and redraw
+# the histograms of the dates that changed (all of them if the period of record changed; with a window, every date
+# whose window includes a changed date)
+def runIncremental(climo_file=climo_file,annual_file=annual_file,station=station,image_dir=image_dir,\
+    plot_dir=plot_dir,state_file=state_file,verbose=True,render_workers=render_workers,window=window_days):
+    if os.path.exists(state_file):
+        accumulator = climate_tools_v2.ClimatologyAccumulator.load(state_file)
+    else:
+        accumulator = climate_tools_v2.ClimatologyAccumulator()
+    previous_years = accumulator.years() if accumulator.last_ordinal else None
+
+    data = climate_tools_v2.loadStation(climo_file)
+    changed = accumulator.update(data['ordinal'],data['doy'],data['high'],data['low'])
+    if not changed.any():
+        if verbose:
+            print("No new observations")
+        return changed
+
+    with profiling.stage("stats"):
+        result = accumulatorStats(accumulator,window=window)
+    if window:
+        changed = climate_tools_v2.circularWindowSums(changed.astype(np.int64),window) > 0
+    if previous_years is None or list(previous_years) != [result['first_year'],result['last_year']]:
+        changed = result['valid'].copy()
+    with profiling.stage("render",np.count_nonzero(changed & result['valid'])):
+        plotHistograms(result,image_dir,verbose=verbose,rows=np.flatnonzero(changed & result['valid']),\
+            workers=render_workers)
+    with profiling.stage("write",np.count_nonzero(result['valid'])):
+        writeStats(result,annual_file,station=station)
+    with profiling.stage("render"):
+        plotSummary(result,result['first_year'],result['last_year'],station,plot_dir)
+    # the state is saved last, so that a run that fails before every output is written is repeated in full
+    accumulator.save(state_file)
+    return changed
+
+# run every stage for a single station
+def run(climo_file=climo_file,annual_file=annual_file,station=station,image_dir=image_dir,plot_dir=plot_dir,\
+    verbose=True,render_workers=render_workers,bootstrap=bootstrap):
+    with profiling.stage("stats"):
+        result = dailyStats(climo_file)
+    if bootstrap:
+        bootstrapStats(result,workers=render_workers)
+    if event_stats:
+        with profiling.stage("events"):
+            writeEvents(climo_file,annual_file)
+    if record_stats:
+        with profiling.stage("records"):
+            writeRecords(climo_file,annual_file)
+    with profiling.stage("render",np.count_nonzero(result['valid'])):
+        plotHistograms(result,image_dir,verbose=verbose,workers=render_workers)
+    with profiling.stage("write",np.count_nonzero(result['valid'])):
+        writeStats(result,annual_file,station=station)
+    with profiling.stage("render"):
+        plotSummary(result,result['first_year'],result['last_year'],station,plot_dir)
+
+# entry point: run the stats for the station in the user settings
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily high/low temperature statistics for a single station.")
+    parser.add_argument("--profile",help="write stage timings to this JSON file (see profiling.py)")
+    parser.add_argument("--profile-format",choices=profiling.FORMATS,help="json (default) or trace (trace-event)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable(args.profile,args.profile_format)
+
+    if incremental:
+        runIncremental()
+    else:
+        run()
+    print("Done")
+
+if __name__ == "__main__":
+    main()
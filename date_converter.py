@@ -1,24 +1,90 @@
-import pandas
-import datetime
+#!/usr/bin/env python
+''' Converts raw daily climate data into the CSV layouts used by the other scripts.
+
+The raw file has no header line and the columns date (MMDDYYYY),high,low,precip. Two files are written:
+    final_file: dates,highs,lows,precip (i.e. dfw_final.csv: 1/01/1900,44.0,27.0,T), used by monthly.py
+    climo_file: Date,Calendar date,High,Low,Precipitation (i.e. dfw.csv: 1/1/1900,01/01,44,27,0.001), used by the
+        daily stats and temperature probability scripts (trace precipitation is written as 0.001)
+
+The raw file is streamed in chunks of chunk_rows rows and the dates are converted with integer arithmetic on the
+digits, so memory use does not depend on the size of the input file.
+
+Usage:
+    python date_converter.py [input_file] [--final dfw_final.csv] [--climo dfw.csv]
+
+Version history:
+1.0: Initial build.
+1.1 (2026 October 17): Streams the input in chunks with vectorized date conversion and also writes the
+    date,calendar date,high,low,precip layout.
+1.2 (2026 October 17): The command line is handled by main(), with the file names as options.
+'''
+
+# import modules
+import argparse
 import numpy as np
+import pandas
+
+### USER SETTINGS SECTION BEGIN ###
+input_file = "dfw_new.csv"      # raw input file (date as MMDDYYYY,high,low,precip; no header line)
+final_file = "dfw_final.csv"    # output file in the dates,highs,lows,precip layout (None to skip)
+climo_file = "dfw.csv"          # output file in the Date,Calendar date,High,Low,Precipitation layout (None to skip)
+chunk_rows = 100000             # number of rows converted at a time
+### USER SETTINGS SECTION END (DO NOT EDIT BELOW THIS LINE UNLESS YOU REALLY KNOW WHAT YOU ARE DOING!) ###
+
+TRACE = "0.001"     # precipitation written for trace amounts in the climo_file layout
+
+# convert one chunk of raw data into the two output layouts
+def convertChunk(chunk):
+    # split MMDDYYYY into its parts
+    stamps = chunk['date'].values
+    months = pandas.Series(stamps // 1000000,index=chunk.index).astype(str)
+    days = pandas.Series((stamps // 10000) % 100,index=chunk.index).astype(str)
+    years = pandas.Series(stamps % 10000,index=chunk.index).astype(str)
+
+    # dates,highs,lows,precip (month without leading zero, i.e. 1/01/1900)
+    final_df = pandas.DataFrame({'dates':months + "/" + days.str.zfill(2) + "/" + years,'highs':chunk['high'],\
+        'lows':chunk['low'],'precip':chunk['precip']})
+
+    # Date,Calendar date,High,Low,Precipitation (i.e. 1/1/1900,01/01)
+    precip = chunk['precip'].str.strip()
+    amounts = pandas.to_numeric(precip,errors='coerce').values
+    precip_text = np.where(np.isnan(amounts),"",np.char.mod("%g",amounts)).astype(object)
+    precip_text[(precip == "T").values] = TRACE
+    climo_df = pandas.DataFrame({'Date':months + "/" + days + "/" + years,\
+        'Calendar date':months.str.zfill(2) + "/" + days.str.zfill(2),\
+        'High':chunk['high'].round().astype('Int64'),'Low':chunk['low'].round().astype('Int64'),\
+        'Precipitation':precip_text})
 
-# import data
-headers = ['date','high','low','precip']
-dtypes = {'date':'str','high':'float','low':'float','precip':'str'}
-df = pandas.read_csv("dfw_new.csv",header=None,names=headers,dtype=dtypes)
+    return final_df,climo_df
 
-# convert date string formats
-dates = df['date']
-new_dates = [datetime.datetime.strptime(x,'%m%d%Y') for x in dates]
-final_dates = [datetime.datetime.strftime(y,'%m/%d/%Y') for y in new_dates]
+# stream the raw file through convertChunk and write the output files; returns the number of rows converted
+def convert(input_file=input_file,final_file=final_file,climo_file=climo_file,chunk_rows=chunk_rows):
+    headers = ['date','high','low','precip']
+    dtypes = {'date':np.int64,'high':'float','low':'float','precip':'str'}
+    reader = pandas.read_csv(input_file,header=None,names=headers,dtype=dtypes,chunksize=chunk_rows)
 
-# remove leading zeros from month
-for i in range(len(final_dates)):
-    if final_dates[i][0] == '0':
-        final_dates[i] = final_dates[i][1:]
+    rows = 0
+    for chunk in reader:
+        final_df,climo_df = convertChunk(chunk)
+        # the header line is written with the first chunk only
+        mode,header = ("w",True) if rows == 0 else ("a",False)
+        if final_file:
+            final_df.to_csv(final_file,mode=mode,header=header,index=False)
+        if climo_file:
+            climo_df.to_csv(climo_file,mode=mode,header=header,index=False)
+        rows += len(chunk)
+    return rows
 
-# create final dataframe
-final_df = pandas.DataFrame({'dates':final_dates,'highs':df['high'],'lows':df['low'],'precip':df['precip']})
+# entry point: convert the files in the user settings (or given on the command line)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert raw daily climate data into the station CSV layouts.")
+    parser.add_argument("input_file",nargs="?",default=input_file,help="raw input file (MMDDYYYY,high,low,precip)")
+    parser.add_argument("--final",default=final_file,help="output file in the dates,highs,lows,precip layout")
+    parser.add_argument("--climo",default=climo_file,\
+        help="output file in the Date,Calendar date,High,Low,Precipitation layout")
+    parser.add_argument("--chunk-rows",type=int,default=chunk_rows,help="number of rows converted at a time")
+    args = parser.parse_args(argv)
+    print("Converted %i rows" % convert(args.input_file,args.final,args.climo,args.chunk_rows))
 
-# output dataframe to csv
-final_df.to_csv('dfw_final.csv',columns=['dates','highs','lows','precip'],index=False)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+''' Parallel rendering of the daily temperature histograms.
+
+Used by daily_climate_stats_1_0.py to draw the ~732 per date histogram images. Each histogram is described by a
+small job (bar heights, bin edges, stats and titles) that is rendered by a pool of worker processes using the Agg
+backend. Every worker builds one figure with its axes, ticks, grid and marker lines once and only updates the bars,
+lines and titles for each job. A manifest of the hashes of the job inputs is kept in the image directory so that
+images whose inputs have not changed since the last run are skipped.
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): Jobs may set their own y ticks (i.e. for histograms pooled over a window of dates).
+    1.2 (2026 October 17): Fixed axis limits (no autoscaling), so that every image has the same scale.
+'''
+
+# import modules
+import concurrent.futures
+import hashlib
+import json
+import numpy as np
+import os
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.2"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+MANIFEST = ".render_manifest.json"  # file name of the manifest of input hashes in the image directory
+YTICKS = np.arange(0,41,5)          # default y ticks of the histograms
+XTICKS = np.arange(-5,115,5)        # x ticks of the histograms
+LAYOUT = 2                          # version of the image layout (images drawn with an older layout are redrawn)
+
+# figure state of the current process (built on first use)
+_canvas = None
+
+# description of one histogram image
+class HistogramJob(object):
+    __slots__ = ("filename","edges","heights","median","lower","upper","stdev","title","suptitle","yticks")
+
+    def __init__(self,filename,edges,heights,median,lower,upper,stdev,title,suptitle,yticks=YTICKS):
+        self.filename = filename
+        self.edges = np.asarray(edges,dtype=float)
+        self.heights = np.asarray(heights,dtype=float)
+        self.median = float(median)
+        self.lower = float(lower)
+        self.upper = float(upper)
+        self.stdev = float(stdev)
+        self.title = title
+        self.suptitle = suptitle
+        self.yticks = np.asarray(yticks,dtype=float)
+
+    # hash of everything that ends up in the image
+    def digest(self):
+        digest = hashlib.sha1()
+        digest.update(b"layout %i\n" % LAYOUT)
+        digest.update(self.edges.tobytes())
+        digest.update(self.heights.tobytes())
+        digest.update(np.array([self.median,self.lower,self.upper,self.stdev]).tobytes())
+        digest.update((self.title + "\n" + self.suptitle).encode("utf-8"))
+        if not np.array_equal(self.yticks,YTICKS):
+            digest.update(self.yticks.tobytes())
+        return digest.hexdigest()
+
+# build the figure, axes and reusable artists for this process
+def _setupCanvas():
+    global _canvas
+    # a bare Figure renders with Agg and never touches the pyplot state of the calling script
+    from matplotlib.figure import Figure
+
+    fig = Figure()
+    ax = fig.add_subplot(1,1,1)
+    ax.set_xticks(XTICKS)
+    ax.tick_params(axis="x",labelrotation=90,labelsize="x-small")
+    ax.grid()
+    _canvas = {
+        'fig': fig,
+        'ax': ax,
+        'bars': None,
+        'median': ax.axvline(x=0,color="red"),
+        'upper': ax.axvline(x=0,color="red",linestyle="--"),
+        'lower': ax.axvline(x=0,color="red",linestyle="--"),
+        'title': ax.set_title("",size="x-small"),
+        'suptitle': fig.suptitle(""),
+    }
+    return _canvas
+
+# draw and save a single histogram with the reusable figure of this process
+def renderJob(job):
+    canvas = _canvas or _setupCanvas()
+    ax = canvas['ax']
+
+    # replace the bars
+    if canvas['bars'] is not None:
+        canvas['bars'].remove()
+    widths = np.diff(job.edges)
+    canvas['bars'] = ax.bar(job.edges[:-1],job.heights,width=widths,align="edge",color="gray")
+
+    # update the y ticks, marker lines and titles
+    ax.set_yticks(job.yticks)
+    for name in ("median","lower","upper"):
+        value = getattr(job,name)
+        canvas[name].set_xdata([value,value])
+    canvas['title'].set_text(job.title)
+    canvas['suptitle'].set_text(job.suptitle)
+
+    # every image has the same axes (the union of the data and the tick ranges), as drawn by the original script
+    ax.set_xlim(min(XTICKS[0],job.edges[0]),max(XTICKS[-1],job.edges[-1]))
+    ax.set_ylim(0,max(job.yticks[-1],job.heights.max() if len(job.heights) else 0))
+    canvas['fig'].savefig(job.filename,bbox_inches="tight")
+    return job.filename
+
+# render histogram jobs, skipping images whose inputs are unchanged since the last run. workers=None uses all CPUs,
+# workers=1 renders in this process. Returns (rendered,skipped) counts.
+def renderHistograms(jobs,image_dir,workers=None,force=False):
+    if not os.path.isdir(image_dir):
+        os.makedirs(image_dir)
+    manifest_file = os.path.join(image_dir,MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_file) and not force:
+        with open(manifest_file,"r") as f:
+            manifest = json.load(f)
+
+    # only render new or changed images
+    digests = dict((job.filename,job.digest()) for job in jobs)
+    todo = [job for job in jobs if force or manifest.get(os.path.basename(job.filename)) != digests[job.filename] \
+        or not os.path.exists(job.filename)]
+
+    if todo:
+        if workers == 1 or len(todo) == 1:
+            for job in todo:
+                renderJob(job)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1,len(todo) // (4 * (workers or os.cpu_count() or 1)))
+                list(pool.map(renderJob,todo,chunksize=chunksize))
+
+    # remember what was rendered
+    for job in jobs:
+        manifest[os.path.basename(job.filename)] = digests[job.filename]
+    temp = "%s.%i.tmp" % (manifest_file,os.getpid())
+    with open(temp,"w") as f:
+        json.dump(manifest,f,indent=0,sort_keys=True)
+    os.rename(temp,manifest_file)
+    return len(todo),len(jobs) - len(todo)
@@ -1,107 +1,124 @@
+#!/usr/bin/env python
+''' Monthly (and other period) average temperature statistics.
+
+Computes the mean, standard deviation and 10th/90th percentiles of the daily average temperature ((high+low)/2)
+for every calendar month, writes them to output_file and plots them. Stats for other periods (season, ISO week,
+year and water year, see climate_tools_v2.PERIODS) with any set of percentiles can be requested at the same time;
+each is written to <output_file without .csv>_<period>.csv. All periods are computed with vectorized grouped
+aggregation, so a long record takes milliseconds.
+
+Usage:
+    python monthly.py [climo_file] [--periods month,season,week,wateryear] [--percentiles 5,25,75,95]
+        [--profile profile.json]
+
+Version history:
+1.0: Initial build.
+1.1 (2026 October 17): Vectorized grouped aggregation for months, seasons, ISO weeks, years and water years.
+1.2 (2026 October 17): Stage timings are recorded with --profile FILE (or CLIMATE_PROFILE, see profiling.py).
+1.3 (2026 October 17): matplotlib is only imported to draw the plot, and the command line is handled by main().
+'''
+
+# import modules
+import argparse
+import climate_tools_v2
 import pandas
-import datetime
 import numpy as np
-import math
-import matplotlib.pyplot as plt
+import os
+import profiling
+
+### USER SETTINGS SECTION BEGIN ###
+climo_file = "dfw_final.csv"    # file path of CSV file containing climate data
+output_file = "dfw_monthly.csv" # file path of output CSV file for the monthly stats
+plot_file = "monthly.png"       # file path of the monthly plot
+periods = []                    # additional periods to write stats for (month,season,week,year,wateryear)
+percentiles = [10,90]           # percentiles to compute for the additional periods
+### USER SETTINGS SECTION END (DO NOT EDIT BELOW THIS LINE UNLESS YOU REALLY KNOW WHAT YOU ARE DOING!) ###
+
+# compute the monthly average temperature stats of a station, write them to output_file and plot them to plot_file
+def run(climo_file=climo_file,output_file=output_file,plot_file=plot_file,periods=periods,percentiles=percentiles):
+    # open the CSV (parsed once, then loaded from the binary cache on later runs)
+    data = climate_tools_v2.loadStation(climo_file)
+    highs = data['high']
+    lows = data['low']
 
-# open the CSV
-df = pandas.read_csv("dfw_final.csv")
-dates = df['dates']
-highs = df['highs']
-lows = df['lows']
+    # daily average temperatures grouped by month (and any other requested periods) in one pass
+    daily_avg = (np.asarray(highs,dtype=float) + np.asarray(lows,dtype=float)) / 2.0
+    with profiling.stage("stats",len(daily_avg)):
+        tables = climate_tools_v2.periodStats(data['ordinal'],daily_avg,["month"] + [p for p in periods if p != "month"],\
+            sorted(set([10.0,90.0] + [float(q) for q in percentiles])))
 
-# convert dates to datetimes
-datetimes = [datetime.datetime.strptime(x,'%m/%d/%Y') for x in dates]
+    # monthly average temperatures
+    months = climate_tools_v2.MONTH_NAMES
+    monthly_avg = tables['month']['mean'].values
+    monthly_std = tables['month']['stdev'].values
+    monthly_lower = tables['month']['p10'].values
+    monthly_upper = tables['month']['p90'].values
 
-# create the lists
-months = ['January','February','March','April','May','June','July','August','September',\
-    'October','November','December']
-jan = []
-feb = []
-mar = []
-apr = []
-may = []
-jun = []
-jul = []
-aug = []
-sep = []
-octo = []
-nov = []
-dec = []
+    # write results to a CSV
+    with profiling.stage("write",len(months) + sum(len(tables[period]) for period in periods)):
+        dataset = {'Month':months,'Average':monthly_avg,'StDev':monthly_std,'25th Pct':monthly_lower,\
+            '75th Pct':monthly_upper}
+        outdata = pandas.DataFrame(data=dataset,index=months)
+        outdata = outdata[['Month','Average','StDev','25th Pct','75th Pct']]
+        outdata.to_csv(output_file,header=['Month','Average','StDev','25th Pct','75th Pct'],\
+            index=False)
 
-# get daily average temperatures
-for i in range(len(datetimes)):
-    if datetimes[i].month == 1:
-        jan.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 2:
-        feb.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 3:
-        mar.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 4:
-        apr.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 5:
-        may.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 6:
-        jun.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 7:
-        jul.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 8:
-        aug.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 9:
-        sep.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 10:
-        octo.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 11:
-        nov.append((highs[i] + lows[i]) / 2.0)
-    elif datetimes[i].month == 12:
-        dec.append((highs[i] + lows[i]) / 2.0)
-    else:
-        raise Exception("Invalid month!")
+        # write the stats of every requested period (i.e. dfw_monthly_season.csv)
+        columns = ['Period','Count','mean','stdev','median','max','min'] + ["p%g" % float(q) for q in percentiles]
+        for period in periods:
+            tables[period][columns].to_csv("%s_%s.csv" % (os.path.splitext(output_file)[0],period),index=False)
 
-list_of_lists = [jan,feb,mar,apr,may,jun,jul,aug,sep,octo,nov,dec]
+    # plot the results
+    with profiling.stage("render"):
+        plotMonthly(months,monthly_avg,monthly_lower,monthly_upper,plot_file)
 
-# compute monthly average temperatures
-monthly_avg = []
-monthly_std = []
-monthly_lower = []
-monthly_upper = []
-for i in range(len(list_of_lists)):
-    monthly_avg.append(np.mean(list_of_lists[i]))
-    monthly_std.append(np.std(list_of_lists[i]))
-    monthly_upper.append(np.percentile(list_of_lists[i],90.0))
-    monthly_lower.append(np.percentile(list_of_lists[i],10.0))
+# plot the monthly mean and 10th/90th percentiles (labeled 25th/75th as in the output file) to plot_file
+def plotMonthly(months,monthly_avg,monthly_lower,monthly_upper,plot_file=plot_file):
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
+    ax = fig.add_subplot(1,1,1)
+    major_ticks = np.arange(30,101,5)
+    minor_ticks = np.arange(30,101,5)
+    ax.set_xticks(np.arange(len(months)))
+    ax.set_yticks(major_ticks)
+    ax.set_yticks(minor_ticks,minor=True)
+    ax.grid(which="both")
+    ax.grid(which="major",alpha=1.0)
+    ax.grid(which="minor",alpha=0.2)
+    dummies = np.arange(len(months))
+    plt.plot(dummies,monthly_upper,color="red",linestyle="-",linewidth=4.0,label="75th Percentile")
+    plt.plot(dummies,monthly_lower,color="blue",linestyle="-",linewidth=4.0,label="25th Percentile")
+    plt.plot(dummies,monthly_avg,color="black",linestyle="-",linewidth=4.0,label="Mean")
+    # plot aesthetics
+    plt.xticks(dummies,months,rotation=90)
+    plt.xlim([0,11])
+    plt.ylim([30,100])
+    plt.xlabel("Month")
+    plt.ylabel("Temperature (degrees Fahrenheit)")
+    plt.title("Monthly Average Temperature")
+    plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
+    # save the figure
+    plt.savefig(plot_file,bbox_inches="tight")
+    plt.clf()
+    plt.close("all")
 
-# write results to a CSV
-dataset = {'Month':months,'Average':monthly_avg,'StDev':monthly_std,'25th Pct':monthly_lower,\
-    '75th Pct':monthly_upper}
-outdata = pandas.DataFrame(data=dataset,index=months)
-outdata = outdata[['Month','Average','StDev','25th Pct','75th Pct']]
-outdata.to_csv("dfw_monthly.csv",header=['Month','Average','StDev','25th Pct','75th Pct'],\
-    index=False)
+# entry point: parse the command line and run
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monthly and other period average temperature statistics.")
+    parser.add_argument("climo_file",nargs="?",default=climo_file,help="station CSV file")
+    parser.add_argument("-o","--output",default=output_file,help="output CSV file for the monthly stats")
+    parser.add_argument("--plot",default=plot_file,help="output file for the monthly plot")
+    parser.add_argument("--periods",default=",".join(periods),help="comma separated periods (%s)" % \
+        ",".join(climate_tools_v2.PERIODS))
+    parser.add_argument("--percentiles",default=",".join(str(q) for q in percentiles),\
+        help="comma separated percentiles for the period stats")
+    parser.add_argument("--profile",help="write stage timings to this JSON file (see profiling.py)")
+    parser.add_argument("--profile-format",choices=profiling.FORMATS,help="json (default) or trace (trace-event)")
+    args = parser.parse_args(argv)
+    if args.profile:
+        profiling.enable(args.profile,args.profile_format)
+    run(args.climo_file,args.output,args.plot,[p for p in args.periods.split(",") if p],\
+        [float(q) for q in args.percentiles.split(",") if q])
 
-# plot the results
-fig = plt.figure(figsize=(16,12),dpi=80,edgecolor="k")
-ax = fig.add_subplot(1,1,1)
-major_ticks = np.arange(30,101,5)
-minor_ticks = np.arange(30,101,5)
-ax.set_xticks(np.arange(len(list_of_lists)))
-ax.set_yticks(major_ticks)
-ax.set_yticks(minor_ticks,minor=True)
-ax.grid(which="both")
-ax.grid(which="major",alpha=1.0)
-ax.grid(which="minor",alpha=0.2)
-dummies = np.arange(len(list_of_lists))
-plt.plot(dummies,monthly_upper,color="red",linestyle="-",linewidth=4.0,label="75th Percentile")
-plt.plot(dummies,monthly_lower,color="blue",linestyle="-",linewidth=4.0,label="25th Percentile")
-plt.plot(dummies,monthly_avg,color="black",linestyle="-",linewidth=4.0,label="Mean")
-# plot aesthetics
-plt.xticks(dummies,months,rotation=90)
-plt.xlim([0,11])
-plt.ylim([30,100])
-plt.xlabel("Month")
-plt.ylabel("Temperature (degrees Fahrenheit)")
-plt.title("Monthly Average Temperature")
-plt.legend(bbox_to_anchor=(1,1),loc="upper left",ncol=1,fontsize="x-small")
-# save the figure
-plt.savefig("monthly.png",bbox_inches="tight")
-plt.clf()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+''' Rolling 30-year climate normals of the daily high and low temperatures.
+
+Computes the per calendar date stats of every window of years (all sliding windows of window_years years, or a
+given list of windows such as 1991-2020) and writes them in the same column layout as the daily stats file
+(dfw_stats.csv: date, high median/mean/stdev/lower/upper/max/min, low median/mean/stdev/lower/upper/max/min) with
+the window label (i.e. 1991-2020) added as the first column. The whole-degree histograms of every year and date are
+accumulated over the years once (climate_tools_v2.YearlyHistograms), so each window is the difference of two prefix
+sums and the stats of a window take the same time whatever its length.
+
+Usage:
+    python normals.py [climo_file] [-o dfw_normals.csv] [--years 30] [--step 10]
+    python normals.py dfw.csv --windows 1961-1990,1991-2020
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+'''
+
+# import modules
+import argparse
+import climate_tools_v2
+import csv
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.0"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+### USER SETTINGS SECTION BEGIN ###
+climo_file = "dfw.csv"              # file path of CSV file containing climate data
+output_file = "dfw_normals.csv"     # file path of output CSV file for the normals
+window_years = 30                   # length of the sliding windows in years
+step = 1                            # years between the start of consecutive sliding windows
+windows = []                        # explicit (first year,last year) windows; overrides the sliding windows
+lower_pct = 10                      # lower percentile
+upper_pct = 90                      # upper percentile
+### USER SETTINGS SECTION END (DO NOT EDIT BELOW THIS LINE UNLESS YOU REALLY KNOW WHAT YOU ARE DOING!) ###
+
+# sliding (first year,last year) windows that lie completely within the record
+def slidingWindows(first_year,last_year,window_years=window_years,step=step):
+    return [(start,start + window_years - 1) for start in range(first_year,last_year - window_years + 2,step)]
+
+# compute the normals of every window and write them to output_file; returns the number of rows written
+def run(climo_file=climo_file,output_file=output_file,window_years=window_years,step=step,windows=windows,\
+    lower_pct=lower_pct,upper_pct=upper_pct):
+    data = climate_tools_v2.loadStation(climo_file)
+    highs = climate_tools_v2.YearlyHistograms(data['ordinal'],data['doy'],data['high'])
+    lows = climate_tools_v2.YearlyHistograms(data['ordinal'],data['doy'],data['low'])
+    if not windows:
+        windows = slidingWindows(highs.first_year,highs.last_year,window_years,step)
+
+    percentiles = (lower_pct,upper_pct)
+    rows = 0
+    with open(output_file,"w") as csvfile:
+        statwriter = csv.writer(csvfile,delimiter=",")
+        for start,end in windows:
+            high_hist = highs.window(start,end)
+            low_hist = lows.window(start,end)
+            label = "%i-%i" % (start,end)
+            for row in climate_tools_v2.statsRows(high_hist.stats(percentiles),low_hist.stats(percentiles),\
+                (high_hist.n > 0) & (low_hist.n > 0)):
+                statwriter.writerow([label] + row)
+                rows += 1
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling climate normals of the daily high and low temperatures.")
+    parser.add_argument("climo_file",nargs="?",default=climo_file,help="station CSV file")
+    parser.add_argument("-o","--output",default=output_file,help="output CSV file for the normals")
+    parser.add_argument("--years",type=int,default=window_years,help="length of the sliding windows in years")
+    parser.add_argument("--step",type=int,default=step,help="years between consecutive sliding windows")
+    parser.add_argument("--windows",default=",".join("%i-%i" % w for w in windows),\
+        help="comma separated windows as first-last year (i.e. 1961-1990,1991-2020)")
+    args = parser.parse_args()
+
+    selected = [tuple(int(year) for year in w.split("-")) for w in args.windows.split(",") if w]
+    print("Wrote %i rows" % run(args.climo_file,args.output,args.years,args.step,selected))
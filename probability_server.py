@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+''' Local temperature probability server.
+
+Long-running asyncio server that answers the same questions as temperature_probability_1_1.py over JSON/HTTP. The
+per date statistics, probability tables and histograms for each station are loaded once at startup, so every
+request is only a table lookup and a few vectorized NumPy calls.
+
+Usage:
+    python probability_server.py dfw=dfw.csv [other=other.csv ...] --port 8765 [--window 7]
+
+Endpoints (all GET, responses are JSON):
+    /probability?station=dfw&date=07/15&high=100&low=75
+        exceedance, non-exceedance, within-range probabilities and percentile ranks (see batchProbabilities in
+        climate_tools_v2). high and low may be repeated to score several temperatures for the same date.
+    /stats?station=dfw&date=07/15
+        the per date statistics from CalendarStats.
+    /stations
+        the loaded stations.
+    /metrics
+        request counters, latency and throughput since startup.
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): --window pools each date with the dates within that many days of it.
+    1.2 (2026 October 17): A malformed Content-Length header is answered with 400 instead of dropping the connection.
+    1.3 (2026 October 17): Non-finite temperatures are rejected, and stations without whole-degree data load (their
+        percentile ranks are null).
+'''
+
+# import modules
+import argparse
+import asyncio
+import climate_tools_v2
+import json
+import math
+import time
+from urllib.parse import parse_qs,urlsplit
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.3"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+STATUS_TEXT = {200:"OK",400:"Bad Request",404:"Not Found",405:"Method Not Allowed",500:"Internal Server Error"}
+
+# precomputed tables for one station
+class StationTables(object):
+    def __init__(self,name,climo_file,window=0):
+        self.name = name
+        self.climo_file = climo_file
+        self.stats = climate_tools_v2.calendarStats(climo_file,window=window)
+        self.table = self.stats.probabilityTable()
+        # percentile ranks need whole-degree data (they are NaN otherwise)
+        try:
+            self.high_hist,self.low_hist = self.stats.histograms()
+        except ValueError:
+            self.high_hist,self.low_hist = None,None
+
+# request counters (latencies in seconds)
+class Metrics(object):
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.open_connections = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.by_path = {}
+
+    def record(self,path,status,latency):
+        self.requests += 1
+        if status >= 400:
+            self.errors += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency,latency)
+        self.by_path[path] = self.by_path.get(path,0) + 1
+
+    def summary(self):
+        uptime = time.time() - self.started
+        return {
+            'uptime_s': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'open_connections': self.open_connections,
+            'requests_per_s': self.requests / uptime if uptime > 0 else 0.0,
+            'mean_latency_ms': 1000.0 * self.total_latency / self.requests if self.requests else 0.0,
+            'max_latency_ms': 1000.0 * self.max_latency,
+            'by_path': self.by_path,
+        }
+
+# error that is reported to the client with an HTTP status code
+class RequestError(Exception):
+    def __init__(self,status,message):
+        Exception.__init__(self,message)
+        self.status = status
+
+class ProbabilityServer(object):
+    def __init__(self,stations):
+        self.stations = dict((station.name,station) for station in stations)
+        self.metrics = Metrics()
+        self.routes = {
+            '/probability': self.probability,
+            '/stats': self.dateStats,
+            '/stations': self.stationList,
+            '/metrics': self.metricsSummary,
+        }
+
+    # look up the station and calendar date of a query
+    def _lookup(self,query):
+        name = query.get('station',[None])[0]
+        if name is None and len(self.stations) == 1:
+            name = list(self.stations)[0]
+        if name not in self.stations:
+            raise RequestError(404,"unknown station: %s" % name)
+        date = query.get('date',[None])[0]
+        if date not in climate_tools_v2.DATE_INDEX:
+            raise RequestError(400,"date must be a calendar date (MM/DD)")
+        return self.stations[name],date
+
+    def probability(self,query):
+        station,date = self._lookup(query)
+        try:
+            highs = [float(x) for x in query['high']]
+            lows = [float(x) for x in query['low']]
+        except (KeyError,ValueError):
+            raise RequestError(400,"high and low temperatures are required")
+        if not all(math.isfinite(x) for x in highs + lows):
+            raise RequestError(400,"high and low temperatures must be finite numbers")
+        if len(highs) != len(lows):
+            raise RequestError(400,"high and low must be given the same number of times")
+
+        rows = [climate_tools_v2.DATE_INDEX[date]] * len(highs)
+        results = climate_tools_v2.batchProbabilities(station.table,rows,highs,lows,station.high_hist,\
+            station.low_hist)
+        response = {'station':station.name,'date':date,'high':highs,'low':lows}
+        for name in climate_tools_v2.PROBABILITY_RESULTS:
+            response[name] = [jsonFloat(x) for x in results[name]]
+        return response
+
+    def dateStats(self,query):
+        station,date = self._lookup(query)
+        row = station.stats.table[climate_tools_v2.DATE_INDEX[date]]
+        response = {'station':station.name,'date':date}
+        for name,value in zip(station.stats.columns,row):
+            response[name] = jsonFloat(value)
+        return response
+
+    def stationList(self,query):
+        return {'stations':dict((name,station.climo_file) for name,station in self.stations.items())}
+
+    def metricsSummary(self,query):
+        return self.metrics.summary()
+
+    # answer a single request, returns (status,body)
+    def dispatch(self,method,target):
+        if method != "GET":
+            raise RequestError(405,"only GET is supported")
+        url = urlsplit(target)
+        if url.path not in self.routes:
+            raise RequestError(404,"unknown path: %s" % url.path)
+        return self.routes[url.path](parse_qs(url.query))
+
+    # serve one connection (HTTP/1.1 keep-alive is supported)
+    async def handle(self,reader,writer):
+        self.metrics.open_connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n",b"\n",b""):
+                        break
+                    key,_,value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                # the body is not used by any endpoint and is skipped; with a malformed length the end of the
+                # request is unknown, so the connection is answered with 400 and closed
+                try:
+                    length = int(headers.get('content-length',0))
+                except ValueError:
+                    length = -1
+                if length > 0:
+                    await reader.readexactly(length)
+
+                start = time.perf_counter()
+                path = "?"
+                try:
+                    if length < 0:
+                        raise ValueError("malformed Content-Length")
+                    method,target,version = request_line.decode("latin-1").split()
+                    path = urlsplit(target).path
+                    status,body = 200,self.dispatch(method,target)
+                except RequestError as error:
+                    status,body = error.status,{'error':str(error)}
+                except ValueError:
+                    status,body,version = 400,{'error':"malformed request"},"HTTP/1.0"
+                except Exception as error:
+                    status,body = 500,{'error':str(error)}
+
+                keep_alive = version == "HTTP/1.1" and headers.get('connection','').lower() != "close"
+                payload = json.dumps(body).encode("utf-8")
+                writer.write(("HTTP/1.1 %i %s\r\nContent-Type: application/json\r\nContent-Length: %i\r\n"
+                    "Connection: %s\r\n\r\n" % (status,STATUS_TEXT[status],len(payload),\
+                    "keep-alive" if keep_alive else "close")).encode("latin-1") + payload)
+                await writer.drain()
+                self.metrics.record(path,status,time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ConnectionError,asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.metrics.open_connections -= 1
+            writer.close()
+
+    async def serve(self,host,port):
+        server = await asyncio.start_server(self.handle,host,port)
+        async with server:
+            await server.serve_forever()
+
+# JSON has no NaN, so missing values become null
+def jsonFloat(value):
+    value = float(value)
+    return None if value != value else value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve temperature probabilities over JSON/HTTP.")
+    parser.add_argument("stations",nargs="+",help="stations to load as name=file (i.e. dfw=dfw.csv)")
+    parser.add_argument("--host",default="127.0.0.1",help="address to listen on (default: localhost only)")
+    parser.add_argument("--port",type=int,default=8765,help="port to listen on")
+    parser.add_argument("--window",type=int,default=0,help="pool each date with the dates this many days either side")
+    args = parser.parse_args()
+
+    stations = []
+    for spec in args.stations:
+        name,_,climo_file = spec.partition("=")
+        stations.append(StationTables(name,climo_file or name,args.window))
+        print("Loaded %s" % name)
+    print("Listening on http://%s:%i" % (args.host,args.port))
+    try:
+        asyncio.run(ProbabilityServer(stations).serve(args.host,args.port))
+    except KeyboardInterrupt:
+        pass
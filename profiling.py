@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+''' Stage-level profiling of the climate scripts.
+
+Wrap a step of a script or library function in a named stage:
+
+    with profiling.stage("load") as s:
+        data = climate_tools_v2.loadStation(climo_file)
+        s.rows = len(data['ordinal'])
+
+When profiling is enabled, every stage records its wall time, CPU time, the peak resident set size of the process
+at the end of the stage and an optional row count, and the records are written when the process exits. Profiling
+is enabled by setting the CLIMATE_PROFILE environment variable to the output file (or with the --profile option of
+the scripts that have one). The file is a JSON list of stages with a per stage summary, or Chrome/Perfetto
+trace-event JSON if CLIMATE_PROFILE_FORMAT is "trace" (or the file name ends in .trace.json). Library functions
+are timed with the profiled() decorator. When profiling is disabled stage() returns a shared do-nothing object and
+profiled() functions only check whether profiling is enabled, so instrumented code costs one call per stage.
+
+Worker processes (i.e. the batch_runner.py pool) record their stages in their own <file>.<pid>.json files. Pool
+workers exit without running atexit handlers, so tasks that run in workers call flush() when they finish.
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): Forked worker processes start their own recorder, and flush() writes it.
+'''
+
+# import modules
+import atexit
+import functools
+import json
+import numpy as np
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:     # not available on Windows; peak RSS is then not recorded
+    resource = None
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.1"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+FORMATS = ("json","trace")
+
+# the active recorder (None when profiling is disabled)
+_recorder = None
+
+# peak resident set size of this process in kB (None if unknown)
+def peakRSS():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+# stage returned when profiling is disabled
+class _NullStage(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*exc):
+        return False
+
+    # row counts are discarded
+    def __setattr__(self,name,value):
+        pass
+
+_NULL_STAGE = _NullStage()
+
+# one timed stage (see stage)
+class Stage(object):
+    __slots__ = ("recorder","name","rows","depth","start","cpu_start")
+
+    def __init__(self,recorder,name,rows=None):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.depth = self.recorder.depth
+        self.recorder.depth += 1
+        self.cpu_start = time.process_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self,*exc):
+        wall = time.perf_counter() - self.start
+        cpu = time.process_time() - self.cpu_start
+        self.recorder.depth -= 1
+        self.recorder.records.append({'name':self.name,'start_s':self.start - self.recorder.started,'wall_s':wall,\
+            'cpu_s':cpu,'peak_rss_kb':peakRSS(),'rows':None if self.rows is None else int(self.rows),\
+            'depth':self.depth})
+        return False
+
+# stage records of this process and where to write them (the records of a worker process go to
+# workerFile(base_file))
+class Recorder(object):
+    def __init__(self,output_file,output_format=None,worker=False):
+        if output_format is None:
+            output_format = "trace" if output_file.endswith(".trace.json") else "json"
+        if output_format not in FORMATS:
+            raise ValueError("unknown profile format: %s" % output_format)
+        self.base_file = output_file
+        self.output_file = workerFile(output_file) if worker else output_file
+        self.output_format = output_format
+        self.worker = worker
+        self.pid = os.getpid()
+        self.started = time.perf_counter()
+        self.depth = 0
+        self.records = []
+
+    # totals of every stage name
+    def summary(self):
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record['name'],{'calls':0,'wall_s':0.0,'cpu_s':0.0,'rows':0,'peak_rss_kb':None})
+            total['calls'] += 1
+            total['wall_s'] += record['wall_s']
+            total['cpu_s'] += record['cpu_s']
+            total['rows'] += record['rows'] or 0
+            if record['peak_rss_kb'] is not None:
+                total['peak_rss_kb'] = max(total['peak_rss_kb'] or 0,record['peak_rss_kb'])
+        return totals
+
+    def write(self):
+        if self.output_format == "trace":
+            events = [{'name':record['name'],'ph':"X",'ts':1e6 * record['start_s'],'dur':1e6 * record['wall_s'],\
+                'pid':self.pid,'tid':0,'args':{'cpu_s':record['cpu_s'],'peak_rss_kb':record['peak_rss_kb'],\
+                'rows':record['rows']}} for record in self.records]
+            output = {'traceEvents':events,'displayTimeUnit':"ms"}
+        else:
+            output = {'command':sys.argv,'pid':self.pid,'total_s':time.perf_counter() - self.started,\
+                'peak_rss_kb':peakRSS(),'stages':self.records,'summary':self.summary()}
+        with open(self.output_file,"w") as f:
+            json.dump(output,f,indent=1)
+
+# <file>.<pid>.json (or <file>.<pid>.trace.json) for the records of a worker process
+def workerFile(output_file,pid=None):
+    ext = ".trace.json" if output_file.endswith(".trace.json") else os.path.splitext(output_file)[1]
+    return "%s.%i%s" % (output_file[:len(output_file) - len(ext)],pid or os.getpid(),ext)
+
+# the recorder of this process. A process forked from the one that enabled profiling (i.e. a ProcessPoolExecutor
+# worker on Linux) inherits its recorder without importing this module again, so it starts its own worker recorder.
+def _current():
+    if _recorder is not None and _recorder.pid != os.getpid():
+        enable(_recorder.base_file,_recorder.output_format,worker=True)
+    return _recorder
+
+# context manager timing a named stage (rows may be given here or set on the returned object)
+def stage(name,rows=None):
+    if _recorder is None:
+        return _NULL_STAGE
+    return Stage(_current(),name,rows)
+
+# decorator timing every call of a function as a stage; rows_arg is the position of the argument whose length is
+# the row count (when disabled, the only cost is one check per call)
+def profiled(name,rows_arg=None):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args,**kwargs):
+            if _recorder is None:
+                return function(*args,**kwargs)
+            rows = np.size(args[rows_arg]) if rows_arg is not None and len(args) > rows_arg else None
+            with Stage(_current(),name,rows):
+                return function(*args,**kwargs)
+        return wrapper
+    return decorator
+
+def enabled():
+    return _recorder is not None
+
+# start recording stages; the records are written to output_file when the process exits (see flush for workers)
+def enable(output_file,output_format=None,worker=False):
+    global _recorder
+    _recorder = Recorder(output_file,output_format,worker)
+    return _recorder
+
+def disable():
+    global _recorder
+    _recorder = None
+
+# write the records of a worker process now. Pool workers leave with os._exit, which skips atexit handlers, so a
+# task that runs in a worker calls this when it finishes (the file is rewritten with all records so far). Does
+# nothing in the process that enabled profiling.
+def flush():
+    if _recorder is not None and _recorder.worker and _recorder.records and _recorder.pid == os.getpid():
+        _recorder.write()
+
+# write the records at exit (only from the process that owns the recorder and only if anything was recorded)
+def _writeAtExit():
+    if _recorder is not None and _recorder.records and _recorder.pid == os.getpid():
+        _recorder.write()
+
+atexit.register(_writeAtExit)
+
+# enable from the environment. Processes started (not forked) by the enabling process import this module again
+# with the variables inherited, so CLIMATE_PROFILE_PID tells them that they are workers
+if os.environ.get("CLIMATE_PROFILE"):
+    _worker = os.environ.setdefault("CLIMATE_PROFILE_PID",str(os.getpid())) != str(os.getpid())
+    enable(os.environ["CLIMATE_PROFILE"],os.environ.get("CLIMATE_PROFILE_FORMAT") or None,_worker)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+''' Builds and queries a memory-mapped multi-station data cube.
+
+The cube (climate_tools_v2.StationCube) holds the highs, lows and precipitation of many stations in one int16 file
+laid out as calendar date x station x year x variable, with a JSON index of the stations and years. A cross-station
+query for one calendar date is a view of one contiguous block of the memory-mapped file instead of a parse of every
+station CSV file, so it reads only that date's pages from disk.
+
+Usage:
+    python station_cube.py build cube/ stations/              (directory of station CSV files or manifest CSV)
+    python station_cube.py query cube/ 07/15 --variable high --percentiles 90
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): The cube puts the calendar date outermost (cubes built by 1.0 must be rebuilt).
+'''
+
+# import modules
+import argparse
+import batch_runner
+import climate_tools_v2
+import csv
+import sys
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.1"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+# build a cube from a directory or manifest of station files (see batch_runner.readStations)
+def build(cube_dir,stations):
+    records = [climate_tools_v2.StationRecord.fromFile(climo_file,station_id,name)
+        for station_id,name,climo_file in batch_runner.readStations(stations)]
+    climate_tools_v2.buildCube(cube_dir,records)
+    return len(records)
+
+# write the stats of every station in the cube for a calendar date as CSV
+def query(cube_dir,date,variable="high",percentiles=(),output=sys.stdout):
+    cube = climate_tools_v2.StationCube(cube_dir)
+    table = cube.dateStats(date,variable,percentiles)
+    statwriter = csv.writer(output,delimiter=",")
+    statwriter.writerow(["station","date"] + [variable + "_" + name for name in climate_tools_v2.STAT_COLUMNS] + \
+        ["%s_p%g" % (variable,q) for q in percentiles])
+    for station,row in zip(cube.stations,table.tolist()):
+        statwriter.writerow([station['id'],date] + row)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query a multi-station data cube.")
+    commands = parser.add_subparsers(dest="command")
+    build_parser = commands.add_parser("build",help="build a cube from station CSV files")
+    build_parser.add_argument("cube_dir",help="directory for the cube")
+    build_parser.add_argument("stations",help="directory of station CSV files or manifest CSV file (id,name,file)")
+    query_parser = commands.add_parser("query",help="stats of every station for a calendar date")
+    query_parser.add_argument("cube_dir",help="directory of the cube")
+    query_parser.add_argument("date",help="calendar date (MM/DD)")
+    query_parser.add_argument("--variable",default="high",choices=climate_tools_v2.CUBE_VARIABLES)
+    query_parser.add_argument("--percentiles",default="",help="comma separated percentiles")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print("Built cube of %i stations" % build(args.cube_dir,args.stations))
+    elif args.command == "query":
+        query(args.cube_dir,args.date,args.variable,[float(q) for q in args.percentiles.split(",") if q])
+    else:
+        parser.print_help()
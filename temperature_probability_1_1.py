@@ -4,24 +4,38 @@
 This temperature will compute the probability of temperatures occurring within a specified range as well
 as exceedance probabilities. The temperature-within-range probabilities are computed by using a multivariate
 distribution. This multivariate distribution is obtained by computing mean and covariance matrices from the
-daily temperature data. The probabilities are finally determined by using a Monte Carlo simulation.
+daily temperature data. The probabilities are finally determined from the bivariate normal CDF in closed form (an
+optional seeded Monte Carlo simulation can be enabled for cross-checking).
 
 Version history:
     1.0: Initial build.
     1.1: Rewrote loop structures using pandas. Now uses climate tools version 2.0.
+    1.2: Percentile ranks come from whole-degree histograms (climate tools version 2.4).
+    1.3: Within-range probability computed analytically instead of by Monte Carlo (climate tools version 2.5).
+    1.4: Per date parameters are computed once at startup (climate tools version 2.6). For scoring many queries at
+         once see temperature_probability_batch.py.
+    1.5: Stage timings are recorded when the CLIMATE_PROFILE environment variable is set (see profiling.py).
+    1.6: Optional pooling of each date with the dates within window_days days of it (climate tools version 3.8).
+    2.0: Python 3. The script can be imported (run a lookup with main()), a single lookup can be given on the
+         command line and the per date parameters come from the station cache (climate tools version 3.9).
+
+Usage:
+    python temperature_probability_1_1.py [climo_file]                              (asks for dates and temperatures)
+    python temperature_probability_1_1.py dfw.csv --date 07/15 --high 100 --low 78  (single lookup)
 '''
 
 # import modules
+import argparse
 import climate_tools_v2
 import numpy as np
-import scipy.stats
+import profiling
 
 __author__ = "Jason W. Godwin"
 __copyright__ = "Public Domain"
 __credits__ = ""
 
 __license__ = "GPL"
-__version__ = "1.1"
+__version__ = "2.0"
 __maintainer__ = "Jason W. Godwin"
 __email__ = "jasonwgodwin@gmail.com"
 __status__ = "Production"
@@ -30,52 +44,87 @@ __status__ = "Production"
 climo_file = "dfw.csv"          # file path of CSV file containing climate data
 station = "Dallas/Fort Worth"   # station name (i.e. "Dallas/Fort Worth", "DFW", "KDFW", etc.)
 skip_header = True              # Does your CSV file have a header line?
+montecarlo_check = False        # set to True to also print a Monte Carlo estimate of the within-range probability
+montecarlo_samples = 10000      # number of Monte Carlo samples
+montecarlo_seed = None          # random seed for the Monte Carlo samples (None: different on every run)
+window_days = 0                 # pool each date with the dates up to this many days either side (0: that date only)
 ### USER SETTINGS SECTION END (DO NOT EDIT BELOW THIS LINE UNLESS YOU REALLY KNOW WHAT YOU ARE DOING!) ###
 
-# import climate data
-print "Running climate statistics (this can take a few minutes for large datasets)"
-dates,calendar_dates,high_medians,high_stdevs,high_means,high_max,high_min,low_medians,low_stdevs,\
-    low_means,low_max,low_min,highs,lows,all_highs,all_lows = climate_tools_v2.climateStats(climo_file)
-
-again = True
-while again:
-    # ask the user for the high and low temperatures
-    high = float(raw_input("High temperature (degrees Fahrenheit): "))
-    low = float(raw_input("Low temperature (degrees Fahrenheit): "))
-    # ask the user for a date to check
-    datecheck = raw_input("Date to check (MM/DD): ")
-    
-    # create multivariate normal distributions for each date to determine joint probability
-    highdist = scipy.stats.norm(high_means[datecheck],high_stdevs[datecheck])       # normal distribution for high temperature
-    lowdist = scipy.stats.norm(low_means[datecheck],low_stdevs[datecheck])          # normal distribution for low temperature
-    prob_high = 1.0 - highdist.cdf(high)                         # probability of exceeding high temperature
-    prob_low = lowdist.cdf(low)                                  # probability of not exceeding low temperature
-
-    # perturbation temperature matrix
-    temp_perturbation = np.array([all_highs[datecheck]-high_means[datecheck],all_lows[datecheck]-low_means[datecheck]])
-
-    # mean temperature matrix
-    temp_mean = np.array([high_means[datecheck],low_means[datecheck]])
-
-    # covariance matrix
-    temp_covariance = np.dot(temp_perturbation,np.transpose(temp_perturbation)) / (np.shape(temp_perturbation)[1] - 1.0)
-
-    # multivariate normal distribution
-    multivariate_dist = np.random.multivariate_normal(temp_mean,temp_covariance,10000)
-    diurnal_range = lambda r: r[0] < high and r[1] > low
-    montecarlo = np.apply_along_axis(diurnal_range,1,multivariate_dist).sum() / 10000.0
-
-    # print the results    
-    print "Probability of exeeding %.0f F on %s: %.1f%%" % (high,datecheck,100.0*prob_high)
-    print "Probability of temperature falling below %.0f F on %s: %.1f%%" % (low,datecheck,100.0*prob_low)
-    print "Probability of tempertature falling within range on %s: %.1f%%" % (datecheck,100.0*montecarlo)
+# print the probabilities and percentile ranks of a high and low temperature on a calendar date (MM/DD)
+def lookup(table,high_hist,low_hist,datecheck,high,low,montecarlo_check=montecarlo_check,\
+    montecarlo_samples=montecarlo_samples,montecarlo_seed=montecarlo_seed):
+    date_row = climate_tools_v2.DATE_INDEX[datecheck]
+
+    # exceedance probabilities from normal distributions of the highs and lows, within-range probability from the
+    # bivariate normal distribution, and percentile ranks
+    probs = climate_tools_v2.batchProbabilities(table,[date_row],[high],[low],high_hist,low_hist)
+
+    # print the results
+    print("Probability of exeeding %.0f F on %s: %.1f%%" % (high,datecheck,100.0*probs['high_exceedance'][0]))
+    print("Probability of temperature falling below %.0f F on %s: %.1f%%" % (low,datecheck,100.0*probs['low_nonexceedance'][0]))
+    print("Probability of tempertature falling within range on %s: %.1f%%" % (datecheck,100.0*probs['range'][0]))
+    if montecarlo_check:
+        params = dict(zip(climate_tools_v2.PROBABILITY_COLUMNS,table[date_row]))
+        temp_mean = np.array([params['high_mean'],params['low_mean']])
+        temp_covariance = np.array([[params['high_var'],params['covariance']],[params['covariance'],params['low_var']]])
+        montecarlo = climate_tools_v2.monteCarloRangeProbability(temp_mean,temp_covariance,high,low,\
+            montecarlo_samples,montecarlo_seed)
+        print("Monte Carlo estimate (%i samples): %.1f%%" % (montecarlo_samples,100.0*montecarlo))
 
     # compute percentile ranks for given date
-    print "\nPercentile rank of high temperature: %.1f" % scipy.stats.percentileofscore(all_highs[datecheck],high,kind="mean")
-    print "Percentile rank of low temperature: %.1f\n" % scipy.stats.percentileofscore(all_lows[datecheck],low,kind="mean")
-
-    # ask the user if they want another search
-    again = raw_input("Search for another date or temperature? (Y/y or N/n)? ")
-    print "\n"
-    if again.lower() != "y":
-        again = False
+    print("\nPercentile rank of high temperature: %.1f" % probs['high_rank'][0])
+    print("Percentile rank of low temperature: %.1f\n" % probs['low_rank'][0])
+    return probs
+
+# entry point: a single lookup if the date, high and low are given, otherwise ask for them until the user stops
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temperature probabilities and percentile ranks for a calendar date.")
+    parser.add_argument("climo_file",nargs="?",default=climo_file,help="station CSV file")
+    parser.add_argument("--date",help="calendar date to check (MM/DD)")
+    parser.add_argument("--high",type=float,help="high temperature (degrees Fahrenheit)")
+    parser.add_argument("--low",type=float,help="low temperature (degrees Fahrenheit)")
+    parser.add_argument("--window",type=int,default=window_days,\
+        help="pool each date with the dates this many days either side")
+    parser.add_argument("--montecarlo",action="store_true",default=montecarlo_check,\
+        help="also print a Monte Carlo estimate of the within-range probability")
+    args = parser.parse_args(argv)
+    single = [args.date,args.high,args.low]
+    if any(value is not None for value in single) and any(value is None for value in single):
+        parser.error("--date, --high and --low must be given together")
+    if args.date is not None and args.date not in climate_tools_v2.DATE_INDEX:
+        parser.error("--date must be a calendar date as MM/DD (i.e. 07/15): %s" % args.date)
+
+    # precompute the per date distribution parameters (read from the station cache after the first run)
+    if single[0] is None:
+        print("Running climate statistics")
+    with profiling.stage("stats"):
+        table,high_hist,low_hist = climate_tools_v2.probabilityTables(args.climo_file,args.window)
+
+    if single[0] is not None:
+        lookup(table,high_hist,low_hist,args.date,args.high,args.low,args.montecarlo)
+        return
+
+    again = True
+    while again:
+        # ask the user for the high and low temperatures
+        try:
+            high = float(input("High temperature (degrees Fahrenheit): "))
+            low = float(input("Low temperature (degrees Fahrenheit): "))
+        except ValueError:
+            print("Temperatures must be numbers\n")
+            continue
+        # ask the user for a date to check
+        datecheck = input("Date to check (MM/DD): ")
+        if datecheck not in climate_tools_v2.DATE_INDEX:
+            print("Not a calendar date (MM/DD, i.e. 07/15): %s\n" % datecheck)
+            continue
+        lookup(table,high_hist,low_hist,datecheck,high,low,args.montecarlo)
+
+        # ask the user if they want another search
+        again = input("Search for another date or temperature? (Y/y or N/n)? ")
+        print("\n")
+        if again.lower() != "y":
+            again = False
+
+if __name__ == "__main__":
+    main()
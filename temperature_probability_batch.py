@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+''' Batch temperature probabilities.
+
+Non-interactive version of temperature_probability_1_1.py for scoring many (date, high, low) queries at once (i.e.
+every member of a forecast ensemble). The per date means, standard deviations and covariances are computed once,
+then the exceedance, non-exceedance, within-range probabilities and percentile ranks are computed for all queries
+with vectorized NumPy calls.
+
+The query file is a CSV file with a header line and the columns date (MM/DD), high and low. Results are written
+as CSV (one row per query) or, if the output file name ends in .npz, as a NumPy archive of arrays.
+
+Usage:
+    python temperature_probability_batch.py dfw.csv queries.csv -o probabilities.csv [--window 7]
+
+Version history:
+    1.0 (2026 October 17): Initial build.
+    1.1 (2026 October 17): --window pools each date with the dates within that many days of it.
+    1.2 (2026 October 17): The per date parameters are read from the station cache (climate_tools_v2.probabilityTables).
+    1.3 (2026 October 17): Queries with a date that is not a calendar date are reported by row instead of stopping
+        with a KeyError.
+'''
+
+# import modules
+import argparse
+import climate_tools_v2
+import numpy as np
+import pandas
+
+__author__ = "Jason W. Godwin"
+__copyright__ = "Public Domain"
+__credits__ = ""
+
+__license__ = "GPL"
+__version__ = "1.3"
+__maintainer__ = "Jason W. Godwin"
+__email__ = "jasonwgodwin@gmail.com"
+__status__ = "Production"
+
+# score arrays of calendar dates (MM/DD), highs and lows against a station's climatology (pooled over +-window
+# days around each date if window is given)
+def scoreQueries(climo_file,dates,highs,lows,window=0):
+    dates = np.asarray(dates,dtype=str)
+    bad = np.nonzero(~np.isin(dates,list(climate_tools_v2.DATE_INDEX)))[0]
+    if len(bad):
+        raise ValueError("not a calendar date as MM/DD (i.e. 07/15) in query row(s) %s" % \
+            ", ".join("%i (%s)" % (row + 1,dates[row]) for row in bad[:10]) + (", ..." if len(bad) > 10 else ""))
+    table,high_hist,low_hist = climate_tools_v2.probabilityTables(climo_file,window)
+    rows = climate_tools_v2.calendarIndex(dates)
+    return climate_tools_v2.batchProbabilities(table,rows,highs,lows,high_hist,low_hist)
+
+# read a query file and write the probabilities for every query
+def scoreFile(climo_file,query_file,output_file,window=0):
+    queries = pandas.read_csv(query_file,dtype={'date':str})
+    results = scoreQueries(climo_file,queries['date'],queries['high'],queries['low'],window)
+
+    if output_file.endswith(".npz"):
+        arrays = dict((name,results[name]) for name in climate_tools_v2.PROBABILITY_RESULTS)
+        np.savez(output_file,date=queries['date'].values.astype(str),high=queries['high'].values.astype(float),\
+            low=queries['low'].values.astype(float),**arrays)
+    else:
+        output = queries[['date','high','low']].copy()
+        for name in climate_tools_v2.PROBABILITY_RESULTS:
+            output[name] = results[name]
+        output.to_csv(output_file,index=False)
+    return len(queries)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score (date,high,low) queries against a station's climatology.")
+    parser.add_argument("climo_file",help="station CSV file (i.e. dfw.csv)")
+    parser.add_argument("query_file",help="CSV file with date (MM/DD), high and low columns")
+    parser.add_argument("-o","--output",default="probabilities.csv",help="output file (.csv or .npz)")
+    parser.add_argument("--window",type=int,default=0,help="pool each date with the dates this many days either side")
+    args = parser.parse_args(argv)
+    try:
+        count = scoreFile(args.climo_file,args.query_file,args.output,args.window)
+    except ValueError as error:
+        parser.error(str(error))
+    print("Scored %i queries" % count)
+
+if __name__ == "__main__":
+    main()